@@ -1,25 +1,32 @@
-from flask import Flask, render_template_string, request, redirect, jsonify
-import subprocess
+from flask import Flask, request, redirect, jsonify, Response
 import os
-from threading import Lock
+import json
+import gzip
+import hashlib
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from threading import Lock, Event
 import requests
+from jobs import start_job, get_job, cancel_job, cancel_topic_jobs, follow, QueueFull
+from warm_pool import get_pool
+import registry
+import metrics
+import engines
+import result_cache
 
 app = Flask(__name__)
 
-# Xotirada mavzular ro'yxati (20 ta)
-topics = {
-    1: {"title": "IP manzillarni avtomatik skanerlovchi va faol hostlarni ko'rsatuvchi ilova", "file": "topic2.py"},
-    2: {"title": "Ping va traceroute buyruqlarini grafik interfeysda bajaruvchi dastur", "file": "topic5.py"},
-    3: {"title": "Tarmoqda foydalanuvchi ulanish holatini kuzatuvchi monitoring tizimi", "file": "topic6.py"},
-    4: {"title": "Lokal chat dasturi (LAN Messenger) – IP orqali xabar almashish", "file": "topic7.py"},
-    5: {"title": "Wi-Fi tarmoqlarini aniqlovchi va signal kuchini o'lchovchi dastur", "file": "topic8.py"},
-    6: {"title": "HTTP so'rovlarini log qiluvchi va statistik chiqaruvchi dastur", "file": "topic12.py"},
-}
-
+# /jobs/<id>/output bir so'rovda qaytaradigan eng ko'p bayt
+MAX_OUTPUT_READ = 1024 * 1024
 
-# Ishga tushirilgan jarayonlar (faqat bitta run uchun)
-running_processes = {}
-process_lock = Lock()
+# Dvigatellar shu jarayon ichida, oqimlar hovuzida bajariladi
+ENGINE_WORKERS = int(os.environ.get("ENGINE_WORKERS", 8))
+ENGINE_TIMEOUT = float(os.environ.get("ENGINE_TIMEOUT", 120))
+engine_pool = ThreadPoolExecutor(max_workers=ENGINE_WORKERS, thread_name_prefix="engine")
+engine_cache = result_cache.ResultCache()
+metrics.Gauge("launcher_engine_cache_bytes", "Dvigatel keshidagi natijalar hajmi",
+              collect=lambda: [((), engine_cache.stats()[1])])
 
 # Frontend HTML
 FRONTEND_HTML = '''<!DOCTYPE html>
@@ -223,9 +230,8 @@ FRONTEND_HTML = '''<!DOCTYPE html>
         const response = await fetch('/run/' + id, { method: 'POST' });
         const data = await response.json();
 
-
         if (data.success) {
-          statusDiv.innerHTML = '<div class="status">✅ ' + data.message + '</div>';
+          streamJob(data.job_id);
         } else {
           statusDiv.innerHTML = '<div class="status" style="background: #fee; border-color: #f00;">❌ ' + data.message + '</div>';
         }
@@ -233,6 +239,60 @@ FRONTEND_HTML = '''<!DOCTYPE html>
         statusDiv.innerHTML = '<div class="status" style="background: #fee; border-color: #f00;">❌ Xatolik yuz berdi</div>';
       }
     }
+
+    // Ish chiqishini SSE orqali qatorma-qator ko'rsatish
+    const MAX_LINES = 5000;
+
+    function streamJob(jobId) {
+      const statusDiv = document.getElementById('status');
+      statusDiv.innerHTML = '<div class="status"><span>⏳ Dastur ishlamoqda... </span>' +
+        '<button onclick="cancelJob(\'' + jobId + '\')">⏹ To\'xtatish</button></div>';
+      const pre = document.createElement('pre');
+      pre.style.whiteSpace = 'pre-wrap';
+      pre.style.maxHeight = '500px';
+      pre.style.overflowY = 'auto';
+      statusDiv.appendChild(pre);
+
+      const source = new EventSource('/jobs/' + jobId + '/stream');
+      source.addEventListener('state', (event) => {
+        const job = JSON.parse(event.data);
+        const label = statusDiv.firstChild.firstChild;
+        if (job.state === 'queued') {
+          label.textContent = '🕒 Navbatda: ' + job.queue_position + '-o\'rin ';
+        } else if (job.state === 'running') {
+          label.textContent = '⏳ Dastur ishlamoqda... ';
+        }
+      });
+      source.onmessage = (event) => {
+        pre.appendChild(document.createTextNode(event.data + '\n'));
+        if (pre.childNodes.length > MAX_LINES) {
+          pre.removeChild(pre.firstChild);
+        }
+        pre.scrollTop = pre.scrollHeight;
+      };
+      source.addEventListener('end', (event) => {
+        source.close();
+        const job = JSON.parse(event.data);
+        if (job.state === 'finished') {
+          statusDiv.firstChild.outerHTML = '<div class="status">✅ Dastur tugadi</div>';
+        } else {
+          let reason = 'xato bilan tugadi (kod ' + job.exit_code + ')';
+          if (job.state === 'cancelled') reason = 'to\'xtatildi';
+          if (job.state === 'timeout') reason = 'vaqt chegarasidan oshdi';
+          statusDiv.firstChild.outerHTML = '<div class="status" style="background: #fee; border-color: #f00;">❌ Dastur ' +
+            reason + '</div>';
+        }
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          statusDiv.firstChild.outerHTML = '<div class="status" style="background: #fee; border-color: #f00;">❌ Aloqa uzildi</div>';
+        }
+      };
+    }
+
+    async function cancelJob(jobId) {
+      await fetch('/jobs/' + jobId + '/cancel', { method: 'POST' });
+    }
   </script>
 </body>
 </html>'''
@@ -340,14 +400,53 @@ ADMIN_HTML = '''<!DOCTYPE html>
 </html>'''
 
 
+# Shablonlar bir marta kompilyatsiya qilinadi
+TEMPLATES = {
+    'index': app.jinja_env.from_string(FRONTEND_HTML),
+    'admin': app.jinja_env.from_string(ADMIN_HTML),
+}
+
+# Tayyor sahifalar: nom -> (topics_version, html, gzip, etag)
+page_cache = {}
+page_cache_lock = Lock()
+
+
+def render_page(name):
+    """Sahifani keshdan beradi; ETag/304 va gzip'ni qo'llab-quvvatlaydi"""
+    # Versiya bazada, shuning uchun boshqa worker qilgan o'zgarish ham ko'rinadi
+    version = registry.topics_version()
+    with page_cache_lock:
+        cached = page_cache.get(name)
+        if cached is None or cached[0] != version:
+            html = TEMPLATES[name].render(topics=registry.list_topics()).encode('utf-8')
+            etag = hashlib.sha1(html).hexdigest()[:16]
+            cached = (version, html, gzip.compress(html, 6), etag)
+            page_cache[name] = cached
+    _, html, compressed, etag = cached
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif 'gzip' in request.accept_encodings:
+        response = Response(compressed, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(html, mimetype='text/html')
+    response.set_etag(etag, weak=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @app.route('/')
+@metrics.timed('index')
 def index():
-    return render_template_string(FRONTEND_HTML, topics=topics)
+    return render_page('index')
 
 
 @app.route('/admin')
+@metrics.timed('admin')
 def admin():
-    return render_template_string(ADMIN_HTML, topics=topics)
+    return render_page('admin')
 
 
 @app.route('/admin/add', methods=['POST'])
@@ -355,62 +454,227 @@ def add_topic():
     title = request.form.get('title')
     file = request.form.get('file')
 
-    new_id = max(topics.keys()) + 1 if topics else 1
-    topics[new_id] = {"title": title, "file": file}
+    registry.add_topic(title, file)
 
     return redirect('/admin')
 
 
 @app.route('/admin/delete/<int:topic_id>', methods=['POST'])
 def delete_topic(topic_id):
-    if topic_id in topics:
-        # Agar jarayon ishlab tursa, to'xtatish
-        with process_lock:
-            if topic_id in running_processes:
-                running_processes[topic_id].terminate()
-                del running_processes[topic_id]
-
-        del topics[topic_id]
+    if registry.delete_topic(topic_id):
+        # Agar jarayonlar ishlab tursa, to'xtatish
+        cancel_topic_jobs(topic_id)
 
     return redirect('/admin')
 
 
+def engine_params():
+    """Dvigatel parametrlari: JSON tanasi, forma yoki query satridan"""
+    params = dict(request.args)
+    params.update(request.form)
+    if request.is_json:
+        params.update(request.get_json(silent=True) or {})
+    return params
+
+
+def run_engine(engine, params, bypass=False):
+    """Dvigatelni hovuzda bajaradi va JSON javob qaytaradi.
+
+    TTL'i bor dvigatellar natijasi keshlanadi; `bypass` keshni o'qimaydi,
+    lekin yangi natijani keshga yozadi.
+    """
+    try:
+        kwargs = engine.parse(params)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    key = result_cache.make_key(engine.name, kwargs)
+    if engine.ttl > 0 and not bypass:
+        hit = engine_cache.get(key)
+        if hit is not None:
+            result, age = hit
+            metrics.ENGINE_CACHE.inc(engine.name, "hit")
+            return jsonify({"success": True, "engine": engine.name, "result": result,
+                            "cached": True, "age": age, "elapsed": 0})
+
+    stop = Event()
+    if engine.stoppable:
+        kwargs["should_stop"] = stop.is_set
+
+    def call():
+        result = engine.func(**kwargs)
+        if stop.is_set():
+            # To'xtatilgan ishning qisman natijasi keshga tushmasin; shu ishni
+            # kutayotgan boshqa so'rovlar ham 504 olishi uchun FutureTimeout
+            raise FutureTimeout("to'xtatildi")
+        return result
+
+    start = time.perf_counter()
+    leader = True
+    if engine.ttl > 0:
+        future, leader = engine_cache.flight(key, engine.ttl, lambda: engine_pool.submit(call))
+        status = "bypass" if bypass else "miss"
+        metrics.ENGINE_CACHE.inc(engine.name, status if leader else "shared")
+    else:
+        future = engine_pool.submit(call)
+
+    try:
+        result = future.result(timeout=ENGINE_TIMEOUT)
+    except FutureTimeout:
+        # To'xtatishni qo'llaydigan dvigatel keyingi qadamda chiqadi
+        if leader:
+            stop.set()
+        return jsonify({"success": False, "engine": engine.name,
+                        "message": "Vaqt tugadi"}), 504
+    except (ValueError, socket.gaierror) as e:
+        # Noto'g'ri subnet, payload hajmi yoki topilmagan host - mijoz xatosi
+        return jsonify({"success": False, "engine": engine.name, "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "engine": engine.name,
+                        "message": f"Xatolik: {str(e)}"}), 500
+
+    return jsonify({"success": True, "engine": engine.name, "result": result,
+                    "cached": False, "shared": not leader, "age": 0,
+                    "elapsed": time.perf_counter() - start})
+
+
+def cache_bypass():
+    return request.args.get('cache') == 'bypass'
+
+
+@app.route('/engines')
+def list_engines():
+    return jsonify({"success": True,
+                    "engines": [e.describe() for e in engines.ENGINES.values()]})
+
+
+@app.route('/engines/<name>', methods=['GET', 'POST'])
+@metrics.timed('engine')
+def engine_endpoint(name):
+    engine = engines.ENGINES.get(name)
+    if engine is None:
+        return jsonify({"success": False, "message": "Dvigatel topilmadi"}), 404
+    return run_engine(engine, engine_params(), cache_bypass())
+
+
 @app.route('/run/<int:topic_id>', methods=['POST'])
+@metrics.timed('run_topic')
 def run_topic(topic_id):
-    if topic_id not in topics:
+    topic = registry.get_topic(topic_id)
+    if topic is None:
         return jsonify({"success": False, "message": "Mavzu topilmadi"})
 
-    topic = topics[topic_id]
     file_path = topic['file']
 
+    # ?headless=1 - GUI oynasi o'rniga mavzu dvigatelini shu jarayonda bajarish
+    if request.args.get('headless') in ('1', 'true'):
+        engine = engines.engine_for_topic(file_path)
+        if engine is None:
+            return jsonify({"success": False, "message": "Bu mavzuda dvigatel yo'q"}), 404
+        return run_engine(engine, engine_params(), cache_bypass())
+
     if not os.path.exists(file_path):
         return jsonify({"success": False, "message": f"Fayl topilmadi: {file_path}"})
 
-    with process_lock:
-        if topic_id in running_processes:
-            if running_processes[topic_id].poll() is None:
-                return jsonify({"success": False, "message": "Dastur allaqachon ishga tushirilgan"})
-            else:
-                del running_processes[topic_id]
-
-        try:
-            # Natijani o'qish uchun PIPE ishlatamiz (timeout o'chirilgan)
-            process = subprocess.Popen(
-                ['python', file_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            running_processes[topic_id] = process
-
-            # Timeout parametri olib tashlandi - dastur tugaguncha kutadi
-            stdout, stderr = process.communicate()
-            message = stdout if stdout else stderr
-            return jsonify({"success": True, "message": message})
-        except Exception as e:
-            return jsonify({"success": False, "message": f"Xatolik: {str(e)}"})
+    priority = request.args.get('priority', 0, type=int)
+    try:
+        # Ish navbatga qo'yiladi, natijani /jobs/<job_id> orqali olish mumkin
+        job = start_job(topic_id, file_path, priority)
+        position = job.queue_position()
+        message = f"Navbatda: {position}-o'rin" if position else "Dastur ishga tushirildi"
+        return jsonify({"success": True, "job_id": job.id, "state": job.state,
+                        "queue_position": position, "message": message})
+    except QueueFull:
+        return jsonify({"success": False, "message": "Navbat to'la, keyinroq urinib ko'ring"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Xatolik: {str(e)}"})
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Ish topilmadi"}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
+
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Ish topilmadi"}), 404
+
+    # Qayta ulanganda brauzer oxirgi olingan qator oxiri (bayt offset) ni yuboradi
+    last_id = request.headers.get('Last-Event-ID', request.args.get('since', ''))
+    since = int(last_id) if last_id.isdigit() else 0
+
+    def state_event():
+        state = {"state": job.state, "queue_position": job.queue_position()}
+        return f'event: state\ndata: {json.dumps(state)}\n\n'
+
+    def generate():
+        yield 'retry: 2000\n\n'
+        yield state_event()
+        for item in follow(job, since, keepalive=5):
+            if item is None:
+                # Navbatdagi o'rin va holatni yangilab turish
+                yield state_event()
+                continue
+            offset, line = item
+            line = line.rstrip('\r\n').replace('\r', '')
+            yield f'id: {offset}\ndata: {line}\n\n'
+        state = {"state": job.state, "exit_code": job.exit_code}
+        yield f'event: end\ndata: {json.dumps(state)}\n\n'
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@app.route('/jobs/<job_id>/output')
+def job_output(job_id):
+    """Chiqishning bir qismini qaytaradi: ?offset=&length= yoki ?tail="""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Ish topilmadi"}), 404
+
+    output = job.output
+    try:
+        if 'tail' in request.args:
+            length = min(int(request.args['tail']), MAX_OUTPUT_READ)
+            offset = max(0, output.size - length)
+        else:
+            offset = int(request.args.get('offset', 0))
+            length = min(int(request.args.get('length', MAX_OUTPUT_READ)), MAX_OUTPUT_READ)
+    except ValueError:
+        return jsonify({"success": False, "message": "Noto'g'ri offset/length"}), 400
+
+    data = output.read(offset, length)
+    return Response(data, mimetype='text/plain', headers={
+        'X-Output-Offset': str(max(0, min(offset, output.size))),
+        'X-Output-Size': str(output.size),
+        'X-Output-Dropped': str(output.dropped),
+    })
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Ish topilmadi"}), 404
+    if not cancel_job(job):
+        return jsonify({"success": False, "message": "Ish allaqachon tugagan"})
+    return jsonify({"success": True, "message": "Ish to'xtatildi"})
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
+    # Isitilgan ishchilarni birinchi so'rovdan oldin tayyorlab qo'yish
+    get_pool()
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,79 @@
+"""Sovuq (yangi python jarayoni) va isitilgan hovuz orqali ishga tushirish
+kechikishini solishtiradi.
+
+Ishlatish: python bench_launch.py [takrorlar_soni]
+
+O'lchanadigan vaqt - ishga tushirishdan bola jarayonning birinchi qatori
+kelguncha (foydalanuvchi natija ko'ra boshlaguncha) bo'lgan vaqt.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import warm_pool
+
+# Mavzular odatda import qiladigan modullar
+SCRIPT = """
+for name in %r:
+    try:
+        __import__(name.strip())
+    except Exception:
+        pass
+print("ready", flush=True)
+""" % (warm_pool.PRELOAD,)
+
+
+def cold_launch(path):
+    start = time.perf_counter()
+    process = subprocess.Popen(['python', path], stdout=subprocess.PIPE)
+    process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.wait()
+    return elapsed
+
+
+def warm_launch(pool, path):
+    start = time.perf_counter()
+    process = pool.spawn(path)
+    process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.wait()
+    process.stdout.close()
+    return elapsed
+
+
+def report(name, samples):
+    samples = sorted(s * 1000 for s in samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:6} median={statistics.median(samples):8.1f}ms  "
+          f"p95={p95:8.1f}ms  min={samples[0]:8.1f}ms")
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    fd, path = tempfile.mkstemp(suffix=".py")
+    with os.fdopen(fd, "w") as f:
+        f.write(SCRIPT)
+
+    try:
+        pool = warm_pool.WarmPool(size=1, max_runs=runs + 1)
+        pool.workers[0].ready.wait()
+
+        cold = [cold_launch(path) for _ in range(runs)]
+        warm = [warm_launch(pool, path) for _ in range(runs)]
+        pool.close()
+
+        print(f"Preload: {', '.join(warm_pool.PRELOAD)}")
+        cold_median = report("cold", cold)
+        warm_median = report("warm", warm)
+        print(f"Tezlashish: {cold_median / warm_median:.1f}x")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Loopback'da TCP xizmatlarni aniqlash tezligini (port/soniya) o'lchaydi.
+
+Ishlatish: python bench_services.py [portlar_soni]
+
+127.0.0.1 da bir nechta tinglovchi soket ochiladi (ba'zilari banner
+yuboradi), so'ng bitta host bo'yicha va bir nechta host bo'yicha
+skaner o'tkaziladi.
+"""
+import socket
+import sys
+import threading
+import time
+
+import services
+
+BANNER = b"SSH-2.0-bench\r\n"
+
+
+def start_listeners(count):
+    """Tasodifiy portlarda tinglovchilar; juftlari banner yuboradi"""
+    listeners = []
+    for i in range(count):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", 0))
+        server.listen(128)
+        listeners.append(server)
+        threading.Thread(target=serve, args=(server, i % 2 == 0), daemon=True).start()
+    return sorted(server.getsockname()[1] for server in listeners)
+
+
+def serve(server, banner):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        try:
+            if banner:
+                conn.sendall(BANNER)
+        except OSError:
+            pass
+        conn.close()
+
+
+def run(name, hosts, ports, **options):
+    found = []
+
+    def on_result(ip, port, state, rtt_ms, banner):
+        if state == services.OPEN:
+            found.append((ip, port, banner))
+
+    scanner = services.ServiceScanner(ports, rate=0, **options)
+    start = time.perf_counter()
+    scanner.run(hosts, on_result)
+    elapsed = time.perf_counter() - start
+    total = len(hosts) * len(ports)
+    banners = sum(1 for _, _, banner in found if banner)
+    print(f"{name:28} {total:7} port  {elapsed:6.2f}s  {total / elapsed:9.0f} port/s  "
+          f"ochiq={len(found)} banner={banners}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    open_ports = start_listeners(8)
+    ports = sorted(set(range(1, count + 1)) | set(open_ports))
+
+    run("1 host, per_host=1024", ["127.0.0.1"], ports, per_host=1024)
+    run("1 host, banner", ["127.0.0.1"], ports, per_host=1024, banner=True,
+        banner_timeout=0.2)
+    hosts = [f"127.0.0.{i}" for i in range(1, 17)]
+    # Tinglovchi portlar birinchi qismga tushsa ham ikki marta tekshirilmasin
+    run("16 host, per_host=64", hosts, sorted(set(ports[:count // 16]) | set(open_ports)),
+        per_host=64)
+
+
+if __name__ == "__main__":
+    main()
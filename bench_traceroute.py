@@ -0,0 +1,39 @@
+"""Parallel traceroute (udptrace) vaqtini o'lchaydi.
+
+Ishlatish: python bench_traceroute.py [manzil] [takrorlar]
+
+Standart manzil 127.0.0.1: yo'l bitta hopdan iborat va javob darhol
+keladi, shuning uchun natija dvigatelning o'z xarajatini ko'rsatadi.
+Javob bermaydigan hoplar bo'lsa, to'liq yo'l ~ RTT + timeout ichida
+aniqlanishi kerak.
+"""
+import sys
+import time
+
+import udptrace
+
+
+def main():
+    dest = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    timeout = 1.0
+
+    with udptrace.UdpTracer(dest, timeout=timeout) as tracer:
+        started = time.perf_counter()
+        first = tracer.round()
+        first_elapsed = time.perf_counter() - started
+        for hop, ip, rtt_ms in first:
+            print(f"{hop:2d}  {ip or '*':15s}  {f'{rtt_ms:.3f} ms' if rtt_ms else ''}")
+        print(f"birinchi raund: {first_elapsed * 1000:.1f} ms "
+              f"({len(first)} hop, timeout {timeout} s)")
+
+        # Keyingi raundlar manzil hopigacha cheklanadi
+        started = time.perf_counter()
+        for _ in range(rounds):
+            tracer.round()
+        elapsed = time.perf_counter() - started
+    print(f"{rounds} raund: o'rtacha {elapsed / rounds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,752 @@
+"""Mavzularning Qt'siz "dvigatellari".
+
+Har bir funksiya oddiy parametrlar oladi va natijani dict ko'rinishida
+qaytaradi, shuning uchun uni GUI oqimidan ham, app.py'dan ham (alohida
+jarayon ishga tushirmasdan) chaqirish mumkin. Ixtiyoriy callback'lar
+orqali GUI natijalarni kelishi bilan ko'rsatadi, `should_stop` esa
+ishni to'xtatish uchun.
+"""
+import collections
+import concurrent.futures
+import functools
+import http.client
+import inspect
+import os
+import platform
+import re
+import socket
+import subprocess
+import time
+import urllib.parse
+
+import host_store
+import icmp
+import iprange
+import probes
+import ratecontrol
+import rttstats
+import services
+import topic8
+import udptrace
+
+
+def _stopped(should_stop):
+    return should_stop is not None and should_stop()
+
+
+# ===================== LAN SKANER (topic2) =====================
+# Bir vaqtda yuborilayotgan ping'lar soni va bitta javobni kutish vaqti
+SWEEP_CONCURRENCY = int(os.environ.get("SWEEP_CONCURRENCY", 64))
+PING_TIMEOUT = float(os.environ.get("PING_TIMEOUT", 1.0))
+
+
+def _ping_command(ip, timeout):
+    system = platform.system().lower()
+    if system == 'windows':
+        return ['ping', '-n', '1', '-w', str(int(timeout * 1000)), ip]
+    if system == 'darwin':
+        return ['ping', '-c', '1', '-W', str(int(timeout * 1000)), ip]
+    return ['ping', '-c', '1', '-W', str(max(1, int(round(timeout)))), ip]
+
+
+def ping_once(ip, timeout=PING_TIMEOUT, should_stop=None):
+    """Hostga bitta ping yuboradi, javob bo'lsa True.
+
+    `should_stop` rost bo'lsa ping jarayoni darhol o'ldiriladi.
+    """
+    try:
+        process = subprocess.Popen(_ping_command(ip, timeout),
+                                   stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+    except Exception:
+        return False
+    while True:
+        try:
+            return process.wait(timeout=0.05) == 0
+        except subprocess.TimeoutExpired:
+            if _stopped(should_stop):
+                process.kill()
+                process.wait()
+                return False
+
+
+def sweep_hosts(hosts, probe=ping_once, concurrency=SWEEP_CONCURRENCY,
+                on_result=None, on_progress=None, should_stop=None):
+    """Hostlarni bir vaqtda `concurrency` tadan tekshiradi.
+
+    `hosts` - istalgan iterable (ro'yxat yaratilmaydi). Callback'lar
+    chaqiruvchi oqimda, natijalar kelish tartibida chaqiriladi.
+    Tekshirilgan hostlar sonini qaytaradi.
+    """
+    total = len(hosts) if hasattr(hosts, "__len__") else None
+    scanned = 0
+    hosts = iter(hosts)
+    pending = set()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        def submit():
+            for ip in hosts:
+                future = pool.submit(probe, ip, should_stop=should_stop)
+                future.ip = ip
+                pending.add(future)
+                return
+
+        for _ in range(max(1, concurrency)):
+            submit()
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, timeout=0.1, return_when=concurrent.futures.FIRST_COMPLETED)
+            if _stopped(should_stop):
+                # Ishlayotgan ping'lar o'zlari should_stop'ni ko'rib chiqadi
+                for future in pending:
+                    future.cancel()
+                break
+            for future in done:
+                pending.discard(future)
+                try:
+                    alive = future.result()
+                except Exception:
+                    alive = False
+                scanned += 1
+                if on_result:
+                    on_result(future.ip, alive)
+                if on_progress and total:
+                    on_progress(int(scanned / total * 100))
+                submit()
+    return scanned
+
+
+class PingProbe:
+    """Har bir host uchun `ping` jarayoni (ICMP soket ochib bo'lmasa)"""
+    name = "ping"
+
+    def __init__(self, timeout=PING_TIMEOUT, concurrency=SWEEP_CONCURRENCY):
+        self.timeout = timeout
+        self.concurrency = concurrency
+
+    def available(self):
+        return True
+
+    def run(self, hosts, on_alive, should_stop=None):
+        def report(ip, alive):
+            if alive:
+                on_alive(ip, None)
+        probe = functools.partial(ping_once, timeout=self.timeout)
+        sweep_hosts(hosts, probe=probe, concurrency=self.concurrency,
+                    on_result=report, should_stop=should_stop)
+
+
+# "auto": arzonidan qimmatiga - jadvaldan o'qish, ICMP (yoki ping), TCP connect
+AUTO_PROBES = "arp,icmp,tcp"
+
+
+def make_probes(method, timeout=PING_TIMEOUT, concurrency=SWEEP_CONCURRENCY,
+                rate=ratecontrol.MAX_PPS):
+    """Usullar satridan (masalan "arp,icmp,tcp") probe'lar ro'yxatini tuzadi.
+
+    ICMP va TCP probe'lar bitta ScanControl'dan foydalanadi: paketlar
+    chegarasi (`rate`, paket/s) umumiy, timeout esa kuzatilgan RTT'lardan.
+    """
+    if method == "auto":
+        method = AUTO_PROBES
+    control = ratecontrol.ScanControl(timeout, rate)
+    chain = []
+    for name in method.split(","):
+        name = name.strip()
+        if name == "arp":
+            probe = probes.ArpProbe()
+        elif name == "icmp":
+            probe = probes.IcmpProbe(timeout, control)
+            if not probe.available():
+                probe = PingProbe(timeout, concurrency)
+        elif name == "ping":
+            probe = PingProbe(timeout, concurrency)
+        elif name == "tcp":
+            probe = probes.TcpProbe(timeout=timeout, control=control)
+        else:
+            raise ValueError(f"Noma'lum usul: {name}")
+        if probe.available():
+            chain.append(probe)
+    return chain
+
+
+def sweep(hosts, method="auto", concurrency=SWEEP_CONCURRENCY, timeout=PING_TIMEOUT,
+          on_result=None, on_progress=None, should_stop=None, report_dead=True,
+          state=None, rate=ratecontrol.MAX_PPS):
+    """`hosts` (iprange.HostRange yoki HostList) dagi hostlarni tekshiradi.
+
+    Probe'lar navbat bilan ishlaydi: har biri faqat oldingilari aniqlay
+    olmagan hostlarni tekshiradi. Oxirigacha aniqlanmaganlar - nofaol.
+    Holat bitmap'da saqlanadi; (iprange.HostState, {indeks: (rtt_ms, usul)})
+    qaytaradi - lug'atda faqat tirik hostlar. Tayyor `state` berilsa
+    faqat undagi UNKNOWN hostlar tekshiriladi.
+    """
+    chain = make_probes(method, timeout, concurrency, rate)
+    if state is None:
+        state = iprange.HostState(len(hosts))
+    targets = iprange.Targets(hosts, state)
+    found = {}
+    progress = {"stage": 0, "start": len(hosts), "percent": -1}
+
+    def tick():
+        # Probe'lar should_stop'ni muntazam chaqiradi - progress shu yerda yangilanadi
+        if on_progress and chain:
+            start = progress["start"]
+            done = (start - len(targets)) / start if start else 1
+            percent = int((progress["stage"] + done) / len(chain) * 100)
+            if percent != progress["percent"]:
+                progress["percent"] = percent
+                on_progress(percent)
+        return _stopped(should_stop)
+
+    for stage, probe in enumerate(chain):
+        if not len(targets) or _stopped(should_stop):
+            break
+        progress["stage"] = stage
+        progress["start"] = len(targets)
+
+        def on_alive(ip, rtt_ms, name=probe.name):
+            index = hosts.index(ip)
+            if index is None or state.get(index) != iprange.UNKNOWN:
+                return
+            state.set(index, iprange.ALIVE)
+            found[index] = (rtt_ms, name)
+            if on_result:
+                on_result(ip, True, rtt_ms, name)
+            tick()
+
+        probe.run(targets, on_alive, tick)
+
+    if not _stopped(should_stop):
+        if on_result and report_dead:
+            for index in state.indexes(iprange.UNKNOWN):
+                on_result(hosts.ip(index), False, None, None)
+        state.replace(iprange.UNKNOWN, iprange.DEAD)
+        if on_progress:
+            on_progress(100)
+    return state, found
+
+
+def record_sweep(hosts, found, scanned_at):
+    """To'liq skaner natijasini host_store'ga yozadi (keyingi qayta skaner uchun)"""
+    alive = {hosts.ip(index): info for index, info in found.items()}
+    was_alive = {ip for ip, row in host_store.known_hosts(hosts).items() if row["alive"]}
+    host_store.save_scan(hosts, alive, was_alive - set(alive), scanned_at)
+
+
+def sweep_subnet(subnet, method="auto", concurrency=SWEEP_CONCURRENCY, timeout=PING_TIMEOUT,
+                 rate=ratecontrol.MAX_PPS, on_result=None, on_progress=None, should_stop=None):
+    """Subnetdagi barcha hostlarni tekshiradi; javobda faqat tirik hostlar ro'yxati"""
+    hosts = iprange.HostRange(subnet)
+    started = time.time()
+    state, found = sweep(hosts, method, concurrency, timeout, on_result=on_result,
+                         on_progress=on_progress, should_stop=should_stop, rate=rate)
+    if not _stopped(should_stop):
+        record_sweep(hosts, found, started)
+    results = [{"ip": hosts.ip(index), "alive": True, "rtt_ms": rtt_ms, "method": name}
+               for index, (rtt_ms, name) in sorted(found.items())]
+    return {
+        "subnet": str(hosts.network),
+        "total": len(hosts),
+        "scanned": len(hosts) - state.count(iprange.UNKNOWN),
+        "alive": [r["ip"] for r in results],
+        "dead": state.count(iprange.DEAD),
+        "results": results,
+    }
+
+
+# Qayta skanerda: shu muddatdan beri ko'rinmagan hostlar "uzoq o'lik"
+DEAD_AGE = float(os.environ.get("RESCAN_DEAD_AGE", 24 * 3600))
+# Uzoq o'lik oraliqlar uchun javob kutish vaqti ko'paytuvchisi
+DEAD_TIMEOUT_FACTOR = 0.25
+# RTT shu miqdordan (ms) va 50% dan ko'p o'zgarsa "changed"
+RTT_CHANGE_MS = 10.0
+
+
+def _rtt_changed(old, new):
+    if old is None or new is None:
+        return False
+    return abs(new - old) > max(RTT_CHANGE_MS, old * 0.5)
+
+
+def rescan_subnet(subnet, method="auto", concurrency=SWEEP_CONCURRENCY, timeout=PING_TIMEOUT,
+                  rate=ratecontrol.MAX_PPS, on_change=None, on_progress=None, should_stop=None):
+    """Oldingi natijalar asosida qayta skanerlaydi va faqat farqni qaytaradi.
+
+    Avval yaqinda tirik bo'lgan hostlar to'liq timeout bilan, keyin qolgan
+    oraliq (oldin skanerlangan bo'lsa) qisqa timeout bilan tekshiriladi.
+    `on_change(tur, ip, rtt_ms, usul)` - tur: "new", "gone" yoki "changed".
+    """
+    hosts = iprange.HostRange(subnet)
+    started = time.time()
+    known = host_store.known_hosts(hosts)
+    previous_scan = host_store.last_scan(hosts)
+    was_alive = {ip for ip, row in known.items() if row["alive"]}
+    recent = [ip for ip, row in known.items() if row["last_seen"] >= started - DEAD_AGE]
+
+    alive = {}
+    diff = {"new": [], "gone": [], "changed": []}
+
+    def report(kind, ip, rtt_ms, name):
+        diff[kind].append({"ip": ip, "rtt_ms": rtt_ms, "method": name})
+        if on_change:
+            on_change(kind, ip, rtt_ms, name)
+
+    def on_alive(ip, _alive, rtt_ms, name):
+        alive[ip] = (rtt_ms, name)
+        row = known.get(ip)
+        if ip not in was_alive:
+            report("new", ip, rtt_ms, name)
+        elif row["method"] != name or _rtt_changed(row["rtt_ms"], rtt_ms):
+            report("changed", ip, rtt_ms, name)
+
+    # 1-bosqich: yaqinda tirik bo'lganlar
+    state = iprange.HostState(len(hosts))
+    if recent:
+        first = iprange.HostList(recent)
+        sweep(first, method, concurrency, timeout, on_result=on_alive,
+              should_stop=should_stop, report_dead=False, rate=rate)
+        for ip in first:
+            state.set(hosts.index(ip), iprange.ALIVE if ip in alive else iprange.DEAD)
+
+    # 2-bosqich: qolgan oraliq; oldin skanerlangan bo'lsa - qisqa timeout
+    rest_timeout = timeout * DEAD_TIMEOUT_FACTOR if previous_scan else timeout
+    sweep(hosts, method, concurrency, rest_timeout, on_result=on_alive,
+          on_progress=on_progress, should_stop=should_stop, report_dead=False, state=state,
+          rate=rate)
+
+    if _stopped(should_stop):
+        # Yarim skaner saqlanmaydi
+        return {"subnet": str(hosts.network), "complete": False, **diff}
+
+    gone = was_alive - set(alive)
+    for ip in sorted(gone, key=iprange.ip_to_int):
+        row = known[ip]
+        report("gone", ip, row["rtt_ms"], row["method"])
+    host_store.save_scan(hosts, alive, gone, started)
+
+    return {
+        "subnet": str(hosts.network),
+        "complete": True,
+        "total": len(hosts),
+        "alive": len(alive),
+        "previous_scan": previous_scan,
+        "elapsed": time.time() - started,
+        **diff,
+    }
+
+
+# ===================== PING VA TRACEROUTE (topic5) =====================
+def parse_ping_line(line):
+    """ping chiqishidagi bitta qatorni tahlil qiladi.
+
+    (paket_hisoblanadimi, muvaffaqiyat, vaqt_ms) yoki None qaytaradi.
+    """
+    lower = line.lower()
+    if 'time=' in lower or 'vreme=' in lower:
+        time_match = re.search(r'time[=<](\d+\.?\d*)', lower)
+        if time_match:
+            return True, True, float(time_match.group(1))
+        return True, True, 0
+    if 'reply' in lower or 'javob' in lower:
+        return False, True, 0
+    if 'timeout' in lower or 'unreachable' in lower:
+        return True, False, 0
+    return None
+
+
+# Jonli statistika shu oraliqdan (soniya) tez-tez yuborilmaydi
+PING_STATS_INTERVAL = 0.25
+# Natijada saqlanadigan oxirgi javoblar soni (xotira probe'lar soniga bog'liq emas)
+PING_REPLY_HISTORY = 100
+
+
+def ping_stats(stats):
+    """rttstats.RttStats dan ping statistikasi (min/max/avg javob bo'lmasa 0)"""
+    snapshot = stats.snapshot()
+    return {
+        'sent': stats.sent,
+        'received': stats.received,
+        'lost': stats.lost,
+        'loss_percent': stats.loss_percent,
+        'min': stats.best or 0,
+        'max': stats.worst or 0,
+        'avg': stats.avg or 0,
+        'stddev': snapshot['stddev'] or 0,
+        'jitter': snapshot['jitter'],
+        'p50': snapshot['p50'] or 0,
+        'p95': snapshot['p95'] or 0,
+        'p99': snapshot['p99'] or 0,
+    }
+
+
+class _PingReporter:
+    """Javoblarni statistikaga qo'shadi, progress va jonli statistikani siyraklashtiradi"""
+
+    def __init__(self, count, on_reply, on_progress, on_stats):
+        self.count = count
+        self.stats = rttstats.RttStats()
+        self.replies = collections.deque(maxlen=PING_REPLY_HISTORY)
+        self.on_reply = on_reply
+        self.on_progress = on_progress
+        self.on_stats = on_stats
+        self.percent = -1
+        self.last_stats = 0.0
+
+    def add(self, text, success, time_ms, counts=True):
+        if counts:
+            self.stats.add(time_ms if success else None)
+        self.replies.append({"text": text, "success": success, "time_ms": time_ms or 0})
+        if self.on_reply:
+            self.on_reply(text, success, time_ms or 0)
+        if not counts:
+            return
+        percent = min(100, int(self.stats.sent / self.count * 100)) if self.count else 100
+        if self.on_progress and percent != self.percent:
+            self.percent = percent
+            self.on_progress(percent)
+        now = time.monotonic()
+        if self.on_stats and now - self.last_stats >= PING_STATS_INTERVAL:
+            self.last_stats = now
+            self.on_stats(ping_stats(self.stats))
+
+    def result(self, host, **extra):
+        stats = ping_stats(self.stats)
+        if self.on_stats:
+            self.on_stats(stats)
+        return {"host": host, **extra, "replies": list(self.replies), "stats": stats}
+
+
+def ping_host(host, count=4, interval=1.0, size=icmp.PAYLOAD_SIZE, timeout=PING_TIMEOUT,
+              on_reply=None, on_progress=None, on_stats=None, should_stop=None):
+    """Hostga `count` ta echo yuboradi va javoblar hamda statistikani qaytaradi.
+
+    Jarayon ichida (icmp.Pinger) bajariladi; ICMP soket ochib bo'lmasa
+    tizimdagi `ping` buyrug'i ishlatiladi (interval va hajm e'tiborsiz).
+    Statistika oqim sifatida hisoblanadi (RTT'lar saqlanmaydi), `on_stats`
+    har PING_STATS_INTERVAL soniyada va oxirida chaqiriladi.
+    """
+    reporter = _PingReporter(count, on_reply, on_progress, on_stats)
+    if not icmp.available():
+        return _ping_host_process(host, count, reporter, should_stop)
+
+    ip = socket.gethostbyname(host)
+
+    def on_result(seq, alive, rtt_ms):
+        if alive:
+            text = f"{size + 8} bayt {ip} dan: icmp_seq={seq} vaqt={rtt_ms:.3f} ms"
+        else:
+            text = f"{ip}: icmp_seq={seq} javob yo'q ({timeout:g} s)"
+        reporter.add(text, alive, rtt_ms)
+
+    with icmp.Pinger(ip, size, timeout) as pinger:
+        pinger.run(count, interval, on_result, should_stop)
+    return reporter.result(host, ip=ip)
+
+
+def _ping_host_process(host, count, reporter, should_stop=None):
+    """`ping -c count host` ni bajaradi (ICMP soket bo'lmaganda)"""
+    param = '-n' if platform.system().lower() == 'windows' else '-c'
+    command = ['ping', param, str(count), host]
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               universal_newlines=True)
+
+    for line in process.stdout:
+        if _stopped(should_stop):
+            process.terminate()
+            break
+
+        parsed = parse_ping_line(line)
+        if parsed is None:
+            continue
+        counts, success, time_ms = parsed
+        reporter.add(line.strip(), success, time_ms, counts)
+
+    process.wait()
+    return reporter.result(host)
+
+
+def format_hop(hop, ip, time_ms):
+    if ip is None:
+        return f"{hop:2d}  * * *"
+    return f"{hop:2d}  {ip}  {time_ms:.3f} ms"
+
+
+def traceroute(host, max_hops=udptrace.MAX_HOPS, timeout=PING_TIMEOUT, on_hop=None,
+               should_stop=None):
+    """Manzilgacha bo'lgan hoplar ro'yxati.
+
+    Linux'da barcha TTL'lar bir vaqtda tekshiriladi (udptrace), boshqa
+    tizimlarda traceroute/tracert buyrug'i ishlatiladi.
+    """
+    if not udptrace.available():
+        return _traceroute_process(host, on_hop, should_stop)
+
+    hops = []
+    for hop, ip, time_ms in udptrace.trace(host, max_hops, timeout, should_stop=should_stop):
+        text = format_hop(hop, ip, time_ms)
+        hops.append({"hop": hop, "ip": ip or 'N/A', "time_ms": time_ms or 0, "text": text})
+        if on_hop:
+            on_hop(text, hop, ip or 'N/A', time_ms or 0)
+    return {"host": host, "hops": hops}
+
+
+def mtr(host, count=10, interval=1.0, max_hops=udptrace.MAX_HOPS, timeout=PING_TIMEOUT,
+        on_round=None, should_stop=None):
+    """MTR: yo'l har `interval` soniyada qayta tekshiriladi (count=0 - to'xtatilguncha).
+
+    `on_round(raund, hoplar)` har raunddan keyin hoplar statistikasi bilan
+    chaqiriladi; har bir hop uchun xotira o'zgarmas.
+    """
+    hops = {}  # ttl -> udptrace.HopStats
+    snapshot = []
+    rounds = 0
+    with udptrace.UdpTracer(host, max_hops, timeout) as tracer:
+        started = time.monotonic()
+        while not count or rounds < count:
+            results = tracer.round(should_stop=should_stop)
+            if _stopped(should_stop):
+                break
+            rounds += 1
+            for hop, ip, time_ms in results:
+                hops.setdefault(hop, udptrace.HopStats(hop)).add(ip, time_ms, rounds)
+            # Manzil yaqinroq hopda topilgan bo'lsa, keyingilari olib tashlanadi
+            for hop in [h for h in hops if h > tracer.last_hop]:
+                del hops[hop]
+            snapshot = [hops[hop].snapshot(rounds) for hop in sorted(hops)]
+            if on_round:
+                on_round(rounds, snapshot)
+            next_round = started + rounds * interval
+            while not _stopped(should_stop) and time.monotonic() < next_round:
+                time.sleep(min(0.05, max(0.0, next_round - time.monotonic())))
+        dest = tracer.dest
+    return {"host": host, "ip": dest, "rounds": rounds, "hops": snapshot}
+
+
+def _traceroute_process(host, on_hop=None, should_stop=None):
+    """traceroute/tracert natijasini hoplar ro'yxati sifatida qaytaradi"""
+    if platform.system().lower() == 'windows':
+        command = ['tracert', '-d', host]
+    else:
+        command = ['traceroute', '-n', host]
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               universal_newlines=True)
+
+    hops = []
+    for line in process.stdout:
+        if _stopped(should_stop):
+            process.terminate()
+            break
+
+        # Parse hop number
+        hop_match = re.search(r'^\s*(\d+)', line)
+        if not hop_match:
+            continue
+        hop_num = int(hop_match.group(1))
+
+        # Parse IP
+        ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
+        ip = ip_match.group(1) if ip_match else 'N/A'
+
+        # Parse time
+        time_match = re.search(r'(\d+\.?\d*)\s*ms', line)
+        time_ms = float(time_match.group(1)) if time_match else 0
+
+        hops.append({"hop": hop_num, "ip": ip, "time_ms": time_ms, "text": line.strip()})
+        if on_hop:
+            on_hop(line.strip(), hop_num, ip, time_ms)
+
+    process.wait()
+    return {"host": host, "hops": hops}
+
+
+# ===================== MONITORING (topic6) =====================
+def monitor_host(host, count=10, interval=1.0, on_result=None, on_progress=None,
+                 should_stop=None):
+    """Hostni `count` marta, `interval` soniya oralig'ida tekshiradi"""
+    param = "-n" if platform.system().lower() == "windows" else "-c"
+    results = []
+    for i in range(1, count + 1):
+        if _stopped(should_stop):
+            break
+        command = ["ping", param, "1", host]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, universal_newlines=True)
+        success = False
+        for line in process.stdout:
+            line = line.strip()
+            if "time=" in line.lower() or "reply" in line.lower():
+                success = True
+        process.wait()
+        results.append({"n": i, "online": success})
+        if on_result:
+            on_result(f"{host} - {'Online' if success else 'Offline'}", success)
+        if on_progress:
+            on_progress(int((i / count) * 100))
+        if i < count:
+            time.sleep(interval)
+    return {
+        "host": host,
+        "checks": len(results),
+        "online": sum(1 for r in results if r["online"]),
+        "results": results,
+    }
+
+
+# ===================== WI-FI (topic8) =====================
+def scan_wifi():
+    """Atrofdagi Wi-Fi tarmoqlar ro'yxati (Windows netsh orqali)"""
+    networks = topic8.parse_windows_output(topic8.scan_windows_once())
+    return {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "networks": networks}
+
+
+# ===================== HTTP TAHLIL (topic12) =====================
+STATUS_DESCRIPTIONS = {
+    200: "OK - Muvaffaqiyatli",
+    201: "Created - Yaratildi",
+    400: "Bad Request - Noto'g'ri so'rov",
+    401: "Unauthorized - Ruxsatsiz",
+    403: "Forbidden - Taqiqlangan",
+    404: "Not Found - Topilmadi",
+    500: "Internal Server Error - Server xatosi"
+}
+
+
+def get_status_description(code):
+    return STATUS_DESCRIPTIONS.get(code, "Noma'lum")
+
+
+def analyze_http(url, timeout=10):
+    """URL'ga GET so'rov yuboradi va javob tahlilini qaytaradi"""
+    parsed_url = urllib.parse.urlparse(url)
+    scheme = parsed_url.scheme
+    host = parsed_url.hostname
+    path = parsed_url.path if parsed_url.path else "/"
+    port = parsed_url.port
+    if not port:
+        port = 443 if scheme == "https" else 80
+
+    start_time = time.time()
+    if scheme == "https":
+        conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        elapsed_time = time.time() - start_time
+        body = response.read().decode('utf-8', errors='replace')
+        headers = {k: v for k, v in response.getheaders()}
+    finally:
+        conn.close()
+
+    return {
+        "url": url,
+        "method": "GET",
+        "host": host,
+        "path": path,
+        "status": response.status,
+        "status_description": get_status_description(response.status),
+        "headers": headers,
+        "body": body[:1000],
+        "body_truncated": len(body) > 1000,
+        "ok": 200 <= response.status < 400,
+        "elapsed": elapsed_time,
+        "size": len(body.encode('utf-8')),
+    }
+
+
+# ===================== RO'YXAT =====================
+def flag(value):
+    """So'rov parametridan mantiqiy qiymat: 1/true/yes/on"""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+class Engine:
+    """Dvigatel funksiyasi va uning parametrlari.
+
+    `params` - nom -> (tur, standart qiymat); standart qiymati None bo'lgan
+    parametr majburiy. `ttl` - natija necha soniya keshda turadi
+    (0 - keshlanmaydi, jonli o'lchovlar uchun).
+    """
+
+    def __init__(self, name, func, params, ttl=0):
+        self.name = name
+        self.func = func
+        self.params = params
+        self.ttl = float(os.environ.get(f"ENGINE_TTL_{name.upper()}", ttl))
+        self.stoppable = "should_stop" in inspect.signature(func).parameters
+
+    def parse(self, raw):
+        """Kiruvchi qiymatlarni turlarga keltiradi, xato bo'lsa ValueError"""
+        kwargs = {}
+        for name, (kind, default) in self.params.items():
+            value = raw.get(name)
+            if value is None or value == "":
+                if default is None:
+                    raise ValueError(f"Parametr kiritilmagan: {name}")
+                value = default
+            try:
+                kwargs[name] = kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Noto'g'ri qiymat: {name}={value!r}")
+        return kwargs
+
+    def describe(self):
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "params": {name: {"type": kind.__name__, "default": default}
+                       for name, (kind, default) in self.params.items()},
+        }
+
+
+ENGINES = {e.name: e for e in [
+    Engine("lan_scan", sweep_subnet,
+           {"subnet": (str, None), "method": (str, "auto"),
+            "concurrency": (int, SWEEP_CONCURRENCY), "timeout": (float, PING_TIMEOUT),
+            "rate": (float, ratecontrol.MAX_PPS)},
+           ttl=300),
+    Engine("lan_rescan", rescan_subnet,
+           {"subnet": (str, None), "method": (str, "auto"),
+            "concurrency": (int, SWEEP_CONCURRENCY), "timeout": (float, PING_TIMEOUT),
+            "rate": (float, ratecontrol.MAX_PPS)}),
+    Engine("services", services.scan_services,
+           {"hosts": (str, None), "ports": (services.parse_ports, services.DEFAULT_PORTS),
+            "timeout": (float, 1.0), "banner": (flag, False),
+            "rate": (float, ratecontrol.MAX_PPS)},
+           ttl=60),
+    Engine("ping", ping_host,
+           {"host": (str, None), "count": (int, 4), "interval": (float, 1.0),
+            "size": (int, icmp.PAYLOAD_SIZE), "timeout": (float, PING_TIMEOUT)}),
+    Engine("traceroute", traceroute,
+           {"host": (str, None), "max_hops": (int, udptrace.MAX_HOPS),
+            "timeout": (float, PING_TIMEOUT)}),
+    Engine("mtr", mtr,
+           {"host": (str, None), "count": (int, 10), "interval": (float, 1.0),
+            "max_hops": (int, udptrace.MAX_HOPS), "timeout": (float, PING_TIMEOUT)}),
+    Engine("monitor", monitor_host,
+           {"host": (str, None), "count": (int, 10), "interval": (float, 1.0)}),
+    Engine("wifi_scan", scan_wifi, {}, ttl=30),
+    Engine("http_analyze", analyze_http, {"url": (str, None)}, ttl=60),
+]}
+
+# Mavzu fayli -> standart dvigatel
+TOPIC_ENGINES = {
+    "topic2.py": "lan_scan",
+    "topic5.py": "ping",
+    "topic6.py": "monitor",
+    "topic8.py": "wifi_scan",
+    "topic12.py": "http_analyze",
+}
+
+
+def engine_for_topic(file_path):
+    name = TOPIC_ENGINES.get(os.path.basename(file_path))
+    return ENGINES.get(name)
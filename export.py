@@ -0,0 +1,87 @@
+"""Skaner natijalarini oqim sifatida NDJSON yoki CSV'ga yozish.
+
+Har bir natija kelishi bilan buferga qo'shiladi va to'plam bo'lib
+(`flush_rows` ta qator yoki `flush_interval` soniyada bir) yoziladi,
+shuning uchun faylni skaner davomida `tail -f` qilish mumkin, xotira esa
+o'smaydi.
+"""
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+FORMATS = ("ndjson", "csv")
+FIELDS = ["timestamp", "ip", "state", "rtt_ms", "method"]
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def format_for(path, default="ndjson"):
+    """Fayl kengaytmasidan format (.csv, .ndjson, .jsonl), qolganlari - standart"""
+    if not path or path == "-":
+        return default
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+class ResultWriter:
+    def __init__(self, stream, fmt="ndjson", flush_rows=256, flush_interval=1.0):
+        if fmt not in FORMATS:
+            raise ValueError(f"Noma'lum format: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.rows = 0
+        if fmt == "csv":
+            self.buffer.append(self._csv_line(FIELDS))
+
+    @staticmethod
+    def _csv_line(values):
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerow(values)
+        return out.getvalue()
+
+    def write(self, ip, state, rtt_ms=None, method=None, timestamp=None):
+        stamp = datetime.fromtimestamp(timestamp if timestamp is not None else time.time(),
+                                       timezone.utc).isoformat(timespec="milliseconds")
+        rtt = round(rtt_ms, 3) if rtt_ms is not None else None
+        if self.fmt == "csv":
+            line = self._csv_line([stamp, ip, state, "" if rtt is None else rtt, method or ""])
+        else:
+            line = json.dumps({"timestamp": stamp, "ip": ip, "state": state,
+                               "rtt_ms": rtt, "method": method}) + "\n"
+        self.buffer.append(line)
+        self.rows += 1
+        if len(self.buffer) >= self.flush_rows or \
+                time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer = []
+        self.stream.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path, fmt=None, **options):
+    """`path` - fayl yoki "-" (stdout); format berilmasa kengaytmadan"""
+    fmt = fmt or format_for(path)
+    if path in (None, "-"):
+        return ResultWriter(sys.stdout, fmt, **options)
+    return ResultWriter(open(path, "w", newline="", encoding="utf-8"), fmt, **options)
@@ -0,0 +1,93 @@
+"""LAN skaner natijalari uchun lokal SQLite ombori.
+
+Faqat qachondir tirik bo'lgan hostlar yoziladi (manzil, oxirgi ko'rilgan
+vaqt, RTT, usul), shuning uchun katta tarmoqlarda ham baza kichik.
+Qaysi oraliq qachon skanerlangani `scans` jadvalida.
+"""
+import os
+import sqlite3
+import threading
+
+import iprange
+
+DB_PATH = os.environ.get(
+    "HOSTS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "hosts.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    addr INTEGER PRIMARY KEY,
+    alive INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    last_checked REAL NOT NULL,
+    rtt_ms REAL,
+    method TEXT
+);
+CREATE TABLE IF NOT EXISTS scans (
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL,
+    scanned_at REAL NOT NULL,
+    PRIMARY KEY (first, last)
+);
+"""
+
+_local = threading.local()
+
+
+def connect():
+    """Joriy oqim uchun ulanish"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None,
+                           check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def known_hosts(hosts):
+    """Oraliqdagi saqlangan hostlar: {ip: row}"""
+    rows = connect().execute(
+        "SELECT * FROM hosts WHERE addr BETWEEN ? AND ?", (hosts.first, hosts.last)).fetchall()
+    return {iprange.int_to_ip(row["addr"]): row for row in rows}
+
+
+def last_scan(hosts):
+    """Shu oraliqni to'liq qamragan oxirgi skaner vaqti yoki None"""
+    row = connect().execute(
+        "SELECT MAX(scanned_at) FROM scans WHERE first <= ? AND last >= ?",
+        (hosts.first, hosts.last)).fetchone()
+    return row[0]
+
+
+def save_scan(hosts, alive, gone, scanned_at):
+    """Skaner natijasini yozadi.
+
+    alive - {ip: (rtt_ms, usul)}, gone - endi javob bermagan hostlar.
+    """
+    conn = connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT INTO hosts (addr, alive, last_seen, last_checked, rtt_ms, method) "
+            "VALUES (?, 1, ?, ?, ?, ?) ON CONFLICT(addr) DO UPDATE SET alive = 1, "
+            "last_seen = excluded.last_seen, last_checked = excluded.last_checked, "
+            "rtt_ms = excluded.rtt_ms, method = excluded.method",
+            ((iprange.ip_to_int(ip), scanned_at, scanned_at, rtt_ms, method)
+             for ip, (rtt_ms, method) in alive.items()))
+        conn.executemany(
+            "UPDATE hosts SET alive = 0, last_checked = ? WHERE addr = ?",
+            ((scanned_at, iprange.ip_to_int(ip)) for ip in gone))
+        conn.execute(
+            "INSERT OR REPLACE INTO scans (first, last, scanned_at) VALUES (?, ?, ?)",
+            (hosts.first, hosts.last, scanned_at))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
@@ -0,0 +1,408 @@
+"""Jarayon ichidagi ICMP echo (ping) dvigateli.
+
+Har bir host uchun `ping` jarayoni ishga tushirilmaydi: bitta soket
+orqali so'rovlar to'plam-to'plam yuboriladi va javoblar (manzil,
+sequence) bo'yicha moslanadi, shuning uchun bitta oqim minglab
+so'rovni bir vaqtda kutishi mumkin.
+
+Avval Linux'ning imtiyozsiz ICMP datagram soketi (net.ipv4.ping_group_range)
+sinab ko'riladi, bo'lmasa raw soket (root yoki CAP_NET_RAW kerak).
+
+`Pinger` - bitta hostga ketma-ket echo (ping -c N o'rniga): vaqtlar
+`time.monotonic_ns()` bilan o'lchanadi, matn tahlil qilinmaydi.
+"""
+import collections
+import errno
+import heapq
+import itertools
+import os
+import select
+import socket
+import struct
+import time
+
+import ratecontrol
+
+ECHO_REQUEST = 8
+ECHO_REPLY = 0
+
+# Bir vaqtda javob kutilayotgan so'rovlar va bir urinishda yuboriladigan paketlar
+MAX_INFLIGHT = int(os.environ.get("ICMP_MAX_INFLIGHT", 4096))
+SEND_BATCH = int(os.environ.get("ICMP_SEND_BATCH", 256))
+PAYLOAD = b"tarmoq-loyihalari-ping"
+# `ping` bilan bir xil standart ma'lumot hajmi (bayt, ICMP sarlavhasisiz)
+PAYLOAD_SIZE = 56
+MAX_PAYLOAD = 65507 - 8
+
+# Raw soketlarda bir jarayondagi barcha sessiyalar (EchoSweep, Pinger)
+# identifikatori farq qilsin: bitta umumiy hisoblagich
+_idents = itertools.count(os.getpid())
+
+
+def next_ident():
+    """Raw soket uchun keyingi 16 bitli ICMP identifikatori"""
+    return next(_idents) & 0xFFFF
+
+
+def checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo(ident, seq, payload=PAYLOAD):
+    header = struct.pack("!BBHHH", ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + payload)
+    return struct.pack("!BBHHH", ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+def open_socket():
+    """(soket, raw_mi) qaytaradi; ikkalasi ham bo'lmasa OSError"""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        raw = False
+    except OSError:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        raw = True
+    sock.setblocking(False)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+    except OSError:
+        pass
+    return sock, raw
+
+
+def available():
+    """Bu tizimda ICMP soket ochish mumkinmi"""
+    try:
+        sock, _ = open_socket()
+    except OSError:
+        return False
+    sock.close()
+    return True
+
+
+def parse_reply(packet, raw):
+    """(ident, seq) yoki echo javobi bo'lmasa None"""
+    if raw:
+        # Raw soket IP sarlavhasini ham qaytaradi
+        if len(packet) < 20:
+            return None
+        packet = packet[(packet[0] & 0x0F) * 4:]
+    if len(packet) < 8:
+        return None
+    icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", packet[:8])
+    if icmp_type != ECHO_REPLY:
+        return None
+    return ident, seq
+
+
+class EchoSweep:
+    """Bitta soket orqali ko'p hostga echo yuboradi.
+
+    `on_result(ip, alive, rtt_ms)` har bir host uchun bir marta chaqiriladi.
+    Tezlik, timeout va qayta urinishlar `control` (ratecontrol.ScanControl)
+    orqali boshqariladi: timeout kuzatilgan RTT'lardan hisoblanadi.
+    Muddati o'tgan urinishlar host uchun oxirgi urinish tugaguncha
+    `expired` da saqlanadi: kech kelgan javob ham host tirik deb hisoblanadi.
+    """
+
+    def __init__(self, timeout=1.0, max_inflight=MAX_INFLIGHT, batch=SEND_BATCH, control=None):
+        self.control = control or ratecontrol.ScanControl(timeout)
+        self.max_inflight = max_inflight
+        self.batch = batch
+        self.sock, self.raw = open_socket()
+        if self.raw:
+            self.ident = next_ident()
+        else:
+            # Datagram soketda identifikatorni yadro beradi (lokal "port")
+            self.sock.bind(("0.0.0.0", 0))
+            self.ident = self.sock.getsockname()[1]
+        self.seq = 0
+        self.pending = {}  # (ip, seq) -> (yuborilgan vaqt, urinish)
+        self.expired = {}  # muddati o'tgan, lekin hali javobi qabul qilinadigan urinishlar
+        self.inflight = {}  # ip -> [seq, ...] - natijasi hali aniqlanmagan hostlar
+        self.deadlines = []  # heap: (muddat, ip, seq)
+        self.retry_queue = collections.deque()  # (ip, urinish) - qayta yuboriladiganlar
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _prefix(ip):
+        return ip.rsplit(".", 1)[0]
+
+    def _send(self, ip, attempt):
+        """True - yuborildi, False - bufer to'la (keyinroq qayta urinish)"""
+        self.seq = (self.seq + 1) & 0xFFFF
+        packet = build_echo(self.ident, self.seq)
+        try:
+            self.sock.sendto(packet, (ip, 0))
+        except (BlockingIOError, InterruptedError):
+            return False
+        except OSError as e:
+            if e.errno == errno.ENOBUFS:
+                return False
+            # Yo'nalish yo'q va h.k. - host javob bermaydi deb hisoblanadi
+            return None
+        now = time.monotonic()
+        self.pending[(ip, self.seq)] = (now, attempt)
+        self.inflight.setdefault(ip, []).append(self.seq)
+        timeout = self.control.timeout_for(self._prefix(ip), attempt)
+        heapq.heappush(self.deadlines, (now + timeout, ip, self.seq))
+        return True
+
+    def _resolve(self, ip):
+        """Host natijasi aniqlandi: uning barcha urinishlari unutiladi"""
+        for seq in self.inflight.pop(ip, ()):
+            self.pending.pop((ip, seq), None)
+            self.expired.pop((ip, seq), None)
+
+    def _receive(self, on_result):
+        while True:
+            try:
+                packet, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            parsed = parse_reply(packet, self.raw)
+            if parsed is None:
+                continue
+            ident, seq = parsed
+            if self.raw and ident != self.ident:
+                continue
+            key = (addr[0], seq)
+            entry = self.pending.get(key) or self.expired.get(key)
+            if entry is None:
+                continue
+            sent, attempt = entry
+            rtt = time.monotonic() - sent
+            self._resolve(addr[0])
+            # Kech kelgan javob ham o'rganiladi - sekin hostlar uchun timeout oshadi
+            self.control.observe(self._prefix(addr[0]), rtt, attempt)
+            if self.control.overall.samples == 1:
+                # Birinchi RTT o'lchandi - boshlang'ich (katta) timeout bilan
+                # kutilayotganlar muddatini qayta hisoblash
+                self._reschedule()
+            on_result(addr[0], True, rtt * 1000)
+
+    def _reschedule(self):
+        self.deadlines = [
+            (sent + self.control.timeout_for(self._prefix(ip), attempt), ip, seq)
+            for (ip, seq), (sent, attempt) in self.pending.items()]
+        heapq.heapify(self.deadlines)
+
+    def _expire(self, on_result):
+        now = time.monotonic()
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, ip, seq = heapq.heappop(self.deadlines)
+            entry = self.pending.pop((ip, seq), None)
+            if entry is None:
+                continue
+            attempt = entry[1]
+            if attempt < self.control.retries:
+                self.expired[(ip, seq)] = entry
+                self.retry_queue.append((ip, attempt + 1))
+            else:
+                self._resolve(ip)
+                on_result(ip, False, None)
+
+    def _next(self, hosts):
+        """Keyingi yuboriladigan (ip, urinish): avval qayta urinishlar"""
+        while self.retry_queue:
+            ip, attempt = self.retry_queue.popleft()
+            # Kech javob bilan aniqlangan hostga qayta yuborilmaydi
+            if ip in self.inflight:
+                return ip, attempt
+        ip = next(hosts, None)
+        return (ip, 0) if ip is not None else None
+
+    def run(self, hosts, on_result, should_stop=None):
+        hosts = iter(hosts)
+        backlog = None  # bufer to'lganda yuborilmay qolgan (ip, urinish)
+        exhausted = False
+        while True:
+            if should_stop is not None and should_stop():
+                return
+            # To'plam bilan yuborish, tezlik chegarasi ichida
+            allowed = self.control.bucket.take(
+                min(self.batch, max(0, self.max_inflight - len(self.pending))))
+            sent = 0
+            while sent < allowed:
+                item = backlog or self._next(hosts)
+                backlog = None
+                if item is None:
+                    exhausted = True
+                    break
+                exhausted = False
+                status = self._send(*item)
+                if status is False:
+                    backlog = item
+                    break
+                if status is None:
+                    self._resolve(item[0])
+                    on_result(item[0], False, None)
+                sent += 1
+            # Ishlatilmagan tokenlar qaytariladi
+            self.control.bucket.tokens += allowed - sent
+
+            if exhausted and not self.pending and not self.retry_queue and backlog is None:
+                return
+
+            wait = 0.05
+            if self.deadlines:
+                wait = min(wait, max(0.0, self.deadlines[0][0] - time.monotonic()))
+            if not exhausted and backlog is None and len(self.pending) < self.max_inflight:
+                wait = min(wait, self.control.bucket.delay())
+            readable, _, _ = select.select([self.sock], [], [], wait)
+            if readable:
+                self._receive(on_result)
+            self._expire(on_result)
+
+
+def make_payload(size):
+    """`size` baytli ma'lumot: PAYLOAD takrorlanadi"""
+    if not 0 <= size <= MAX_PAYLOAD:
+        raise ValueError(f"Noto'g'ri paket hajmi: {size}")
+    return (PAYLOAD * (size // len(PAYLOAD) + 1))[:size]
+
+
+class Pinger:
+    """Bitta hostga `interval` oralig'ida echo yuboradi.
+
+    Yuborish jadvali boshlanish vaqtiga bog'langan (siljimaydi), javob
+    kutish vaqti `interval` dan katta bo'lsa bir nechta so'rov bir vaqtda
+    kutiladi. `on_result(seq, alive, rtt_ms)` har bir so'rov uchun bir marta.
+    """
+
+    def __init__(self, ip, size=PAYLOAD_SIZE, timeout=1.0):
+        self.ip = ip
+        self.payload = make_payload(size)
+        self.timeout_ns = int(timeout * 1e9)
+        self.sock, self.raw = open_socket()
+        if self.raw:
+            self.ident = next_ident()
+        else:
+            self.sock.bind(("0.0.0.0", 0))
+            self.ident = self.sock.getsockname()[1]
+        self.pending = {}  # seq -> yuborilgan vaqt (ns)
+
+    @property
+    def size(self):
+        return len(self.payload)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, seq):
+        packet = build_echo(self.ident, seq, self.payload)
+        sent = time.monotonic_ns()
+        try:
+            self.sock.sendto(packet, (self.ip, 0))
+        except (BlockingIOError, InterruptedError):
+            return False
+        except OSError as e:
+            if e.errno == errno.ENOBUFS:
+                return False
+            raise
+        self.pending[seq] = sent
+        return True
+
+    def _receive(self, on_result):
+        while True:
+            try:
+                packet, addr = self.sock.recvfrom(MAX_PAYLOAD + 128)
+            except (BlockingIOError, InterruptedError):
+                return
+            received = time.monotonic_ns()
+            if addr[0] != self.ip:
+                continue
+            parsed = parse_reply(packet, self.raw)
+            if parsed is None:
+                continue
+            ident, seq = parsed
+            if self.raw and ident != self.ident:
+                continue
+            sent = self.pending.pop(seq, None)
+            if sent is not None:
+                on_result(seq, True, (received - sent) / 1e6)
+
+    def _expire(self, on_result, now):
+        # pending yuborilish tartibida, timeout hammasiga bir xil
+        expired = []
+        for seq, sent in self.pending.items():
+            if now - sent < self.timeout_ns:
+                break
+            expired.append(seq)
+        for seq in expired:
+            del self.pending[seq]
+            on_result(seq, False, None)
+
+    def run(self, count, interval=1.0, on_result=None, should_stop=None):
+        if interval < 0:
+            raise ValueError(f"Noto'g'ri interval: {interval}")
+        interval_ns = int(interval * 1e9)
+        on_result = on_result or (lambda *args: None)
+        start = time.monotonic_ns()
+        sent = 0
+        while sent < count or self.pending:
+            if should_stop is not None and should_stop():
+                return
+            now = time.monotonic_ns()
+            # Vaqti kelganlar to'plam bilan; javoblarni o'qish to'xtab qolmasin
+            burst = 0
+            blocked = False
+            while sent < count and burst < SEND_BATCH and now >= start + sent * interval_ns:
+                # Sequence 1 dan, 16 bitda aylanadi; hali kutilayotgani qayta ishlatilmaydi
+                seq = sent % 0xFFFF + 1
+                if seq in self.pending or not self._send(seq):
+                    blocked = True
+                    break
+                sent += 1
+                burst += 1
+            self._expire(on_result, now)
+
+            # Keyingi hodisagacha: yuborish vaqti yoki eng yaqin muddat
+            wait_ns = 50_000_000
+            if sent < count:
+                if burst == SEND_BATCH:
+                    wait_ns = 0
+                elif blocked:
+                    # Bufer to'la - biroz kutib qayta urinish
+                    wait_ns = 1_000_000
+                else:
+                    wait_ns = min(wait_ns, max(0, start + sent * interval_ns - now))
+            if self.pending:
+                first = next(iter(self.pending.values()))
+                wait_ns = min(wait_ns, max(0, first + self.timeout_ns - now))
+            readable, _, _ = select.select([self.sock], [], [], wait_ns / 1e9)
+            if readable:
+                self._receive(on_result)
+
+
+def sweep(hosts, timeout=1.0, on_result=None, should_stop=None, **options):
+    """Hostlarni ICMP echo bilan tekshiradi, (ip, alive, rtt_ms) ro'yxatini qaytaradi.
+
+    `on_result` berilsa natijalar faqat unga uzatiladi va ro'yxat
+    yig'ilmaydi (None qaytadi) - katta tarmoqlarda xotira o'smasin.
+    """
+    results = None if on_result else []
+    with EchoSweep(timeout=timeout, **options) as engine:
+        engine.run(hosts, on_result or (lambda *row: results.append(row)), should_stop)
+    return results
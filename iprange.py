@@ -0,0 +1,209 @@
+"""Katta skanerlar uchun tejamkor manzillar oralig'i va holat bitmap'i.
+
+Manzillar butun son sifatida saqlanadi, satr faqat kerak bo'lganda
+(probe'ga yoki foydalanuvchiga berilganda) yasaladi. Har bir host holati
+2 bit: /8 tarmoq uchun ham ~4 MB.
+"""
+import bisect
+import ipaddress
+import socket
+import struct
+
+UNKNOWN = 0
+ALIVE = 1
+DEAD = 2
+
+# Eng katta skaner: /8 (16M host)
+MAX_HOSTS = 1 << 24
+
+
+def int_to_ip(value):
+    return socket.inet_ntoa(struct.pack("!I", value))
+
+
+def ip_to_int(ip):
+    return struct.unpack("!I", socket.inet_aton(ip))[0]
+
+
+class HostRange:
+    """Tarmoqdagi hostlar (`net.hosts()` bilan bir xil) - ro'yxat yaratmasdan"""
+
+    def __init__(self, network):
+        net = ipaddress.ip_network(network, strict=False)
+        if net.version != 4:
+            raise ValueError("Faqat IPv4 tarmoqlar qo'llab-quvvatlanadi")
+        first = int(net.network_address)
+        last = int(net.broadcast_address)
+        if net.prefixlen < 31:
+            # Tarmoq va broadcast manzillari hostlarga kirmaydi
+            first += 1
+            last -= 1
+        if last - first + 1 > MAX_HOSTS:
+            raise ValueError(f"Tarmoq juda katta (eng ko'pi /8): {net}")
+        self.network = net
+        self.first = first
+        self.last = last
+
+    @classmethod
+    def span(cls, first, last, network=None):
+        """[first, last] butun sonlar oralig'i (qismlarga bo'lish uchun)"""
+        hosts = cls.__new__(cls)
+        hosts.first = first
+        hosts.last = last
+        hosts.network = network
+        return hosts
+
+    def split(self, size):
+        """Oraliqni `size` tadan hostli qismlarga bo'ladi"""
+        for first in range(self.first, self.last + 1, size):
+            yield HostRange.span(first, min(first + size - 1, self.last), self.network)
+
+    def __len__(self):
+        return self.last - self.first + 1
+
+    def __iter__(self):
+        for value in range(self.first, self.last + 1):
+            yield int_to_ip(value)
+
+    def ip(self, index):
+        return int_to_ip(self.first + index)
+
+    def index(self, ip):
+        """Manzilning tartib raqami yoki tarmoqda bo'lmasa None"""
+        try:
+            value = ip_to_int(ip)
+        except OSError:
+            return None
+        if self.first <= value <= self.last:
+            return value - self.first
+        return None
+
+    def __contains__(self, ip):
+        return self.index(ip) is not None
+
+
+class HostList:
+    """Ixtiyoriy manzillar to'plami, HostRange bilan bir xil interfeys"""
+
+    def __init__(self, ips):
+        self.values = sorted({ip_to_int(ip) for ip in ips})
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        for value in self.values:
+            yield int_to_ip(value)
+
+    def ip(self, index):
+        return int_to_ip(self.values[index])
+
+    def index(self, ip):
+        try:
+            value = ip_to_int(ip)
+        except OSError:
+            return None
+        index = bisect.bisect_left(self.values, value)
+        if index < len(self.values) and self.values[index] == value:
+            return index
+        return None
+
+    def __contains__(self, ip):
+        return self.index(ip) is not None
+
+
+class HostState:
+    """Har bir host uchun 2 bitli holat: UNKNOWN, ALIVE yoki DEAD"""
+
+    def __init__(self, size):
+        self.size = size
+        self.bits = bytearray((size + 3) // 4)
+        self.counts = [size, 0, 0]
+
+    def get(self, index):
+        return (self.bits[index >> 2] >> ((index & 3) * 2)) & 3
+
+    def set(self, index, state):
+        shift = (index & 3) * 2
+        byte = self.bits[index >> 2]
+        old = (byte >> shift) & 3
+        if old == state:
+            return
+        self.bits[index >> 2] = (byte & ~(3 << shift)) | (state << shift)
+        self.counts[old] -= 1
+        self.counts[state] += 1
+
+    def count(self, state):
+        return self.counts[state]
+
+    def replace(self, old, new):
+        """`old` holatidagi barcha hostlarni `new` ga o'tkazadi"""
+        table = bytes(
+            sum((new if (byte >> (o * 2)) & 3 == old else (byte >> (o * 2)) & 3) << (o * 2)
+                for o in range(4))
+            for byte in range(256))
+        size = self.size
+        tail = self.bits[-1] if self.bits and size % 4 else None
+        self.bits = bytearray(self.bits.translate(table))
+        if tail is not None:
+            # Oxirgi baytning ortiqcha (host bo'lmagan) bitlari o'zgarmasin
+            keep = (1 << ((size % 4) * 2)) - 1
+            self.bits[-1] = (self.bits[-1] & keep) | (tail & ~keep)
+        self.counts[new] += self.counts[old]
+        self.counts[old] = 0
+
+    def indexes(self, state):
+        """Shu holatdagi hostlar tartib raqamlari.
+
+        Bitmap bo'laklarga bo'lib `translate` qilinadi va mos baytlar
+        `find` bilan qidiriladi, shuning uchun siyrak holatlar ham tez o'tadi.
+        """
+        table = _MATCHES[state]
+        flags = _FLAGS[state]
+        bits = self.bits
+        for chunk_start in range(0, len(bits), CHUNK):
+            marks = bits[chunk_start:chunk_start + CHUNK].translate(flags)
+            pos = marks.find(1)
+            while pos != -1:
+                byte_index = chunk_start + pos
+                base = byte_index * 4
+                for offset in table[bits[byte_index]]:
+                    index = base + offset
+                    if index < self.size:
+                        yield index
+                pos = marks.find(1, pos + 1)
+
+
+# indexes() bir urinishda ko'radigan baytlar soni
+CHUNK = 64 * 1024
+
+# Har bir holat va bayt qiymati uchun: shu holatdagi 2-bitli o'rinlar
+_MATCHES = [
+    [tuple(offset for offset in range(4) if (byte >> (offset * 2)) & 3 == state)
+     for byte in range(256)]
+    for state in (UNKNOWN, ALIVE, DEAD)
+]
+# translate() jadvali: baytda shu holatdagi host bormi (1/0)
+_FLAGS = [bytes(1 if offsets else 0 for offsets in table) for table in _MATCHES]
+
+
+class Targets:
+    """Hali aniqlanmagan hostlar: probe'lar uchun dangasa satrlar oqimi.
+
+    `ip in targets` - manzil oraliqda va holati hali UNKNOWN.
+    """
+
+    def __init__(self, hosts, state):
+        self.hosts = hosts
+        self.state = state
+
+    def __len__(self):
+        return self.state.count(UNKNOWN)
+
+    def __iter__(self):
+        for index in self.state.indexes(UNKNOWN):
+            yield self.hosts.ip(index)
+
+    def __contains__(self, ip):
+        index = self.hosts.index(ip)
+        return index is not None and self.state.get(index) == UNKNOWN
@@ -0,0 +1,560 @@
+import bisect
+import itertools
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from threading import Lock
+
+import metrics
+import registry
+import warm_pool
+
+# Ishga tushirilgan ishlar (job_id -> Job)
+jobs = {}
+# Kutish vaqti /metrics orqali kuzatiladi
+process_lock = metrics.TimedLock(metrics.LOCK_WAIT)
+
+# Tugagan ishlardan nechtasini xotirada saqlash
+JOB_HISTORY = 200
+# Ish loglari saqlanadigan papka (bir nechta worker uchun umumiy)
+LOG_DIR = os.environ.get("JOB_LOG_DIR", os.path.join(tempfile.gettempdir(), "tarmoq-jobs"))
+# Chiqish shu hajmdan oshsa log faylga yoziladi (bayt). Bir nechta worker
+# bo'lsa darhol faylga yoziladi, aks holda boshqa worker uni ko'ra olmaydi.
+SPILL_BYTES = int(os.environ.get(
+    "JOB_SPILL_BYTES",
+    0 if int(os.environ.get("WEB_CONCURRENCY", 1)) > 1 else 256 * 1024
+))
+# Faylga o'tilgandan keyin xotirada qoladigan oxirgi baytlar (tail uchun)
+RING_BYTES = int(os.environ.get("JOB_RING_BYTES", 64 * 1024))
+# Bitta ish chiqishining yuqori chegarasi, undan keyingisi tashlab yuboriladi
+MAX_OUTPUT_BYTES = int(os.environ.get("JOB_MAX_OUTPUT_BYTES", 64 * 1024 * 1024))
+# Holat javobida qaytariladigan chiqish oxiri (bayt)
+STATUS_TAIL_BYTES = 16 * 1024
+# Stream o'qishda bir martada olinadigan bo'lak
+READ_CHUNK = 64 * 1024
+# Boshqa worker'dagi ishni kuzatishda bazani tekshirish oralig'i (soniya)
+POLL_INTERVAL = 0.5
+# Bekor qilingandan keyin majburan o'ldirishgacha kutish (soniya)
+KILL_GRACE = 5
+
+# Rejalashtiruvchi cheklovlari (har bir worker jarayoni uchun)
+MAX_RUNNING = int(os.environ.get("JOB_MAX_RUNNING", 8))
+MAX_PER_TOPIC = int(os.environ.get("JOB_MAX_PER_TOPIC", 2))
+QUEUE_LIMIT = int(os.environ.get("JOB_QUEUE_LIMIT", 100))
+# Ishning eng uzoq davomiyligi, soniya (0 - cheklanmagan)
+TIMEOUT = float(os.environ.get("JOB_TIMEOUT", 1800))
+# Bola jarayon uchun CPU vaqti (soniya) va xotira (MB) chegaralari, 0 - yo'q
+CPU_LIMIT = int(os.environ.get("JOB_CPU_SECONDS", 0))
+MEMORY_LIMIT = int(os.environ.get("JOB_MEMORY_MB", 0))
+
+# Navbatdagi ishlar: (-priority, tartib raqami, job), tartiblangan
+queue = []
+# Mavzu bo'yicha ishlayotgan ishlar soni
+running_count = {}
+_queue_seq = itertools.count()
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _running_metrics():
+    with process_lock:
+        return [((str(topic),), count) for topic, count in running_count.items()]
+
+
+def _queue_metrics():
+    return [((), len(queue))]
+
+
+metrics.Gauge("launcher_jobs_running", "Hozir ishlayotgan ishlar (mavzu bo'yicha)",
+              ("topic",), _running_metrics)
+metrics.Gauge("launcher_jobs_queued", "Navbatdagi ishlar soni", (), _queue_metrics)
+
+
+class OutputCapture:
+    """Ish chiqishini saqlovchi chegaralangan bufer.
+
+    Dastlab hammasi xotirada turadi; hajm SPILL_BYTES'dan oshsa `path`
+    fayliga (yoki nomsiz vaqtinchalik faylga) ko'chiriladi va xotirada faqat
+    oxirgi RING_BYTES qoladi. Istalgan bayt oralig'ini butun logni
+    yuklamasdan o'qish mumkin.
+    """
+
+    def __init__(self, path=None, spill_bytes=SPILL_BYTES, ring_bytes=RING_BYTES,
+                 max_bytes=MAX_OUTPUT_BYTES):
+        self.path = path
+        self.spill_bytes = spill_bytes
+        self.ring_bytes = ring_bytes
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.buffer = bytearray()  # faylga o'tilmaguncha hammasi, keyin oxirgi qismi
+        self.file = None
+        self.size = 0     # saqlangan baytlar
+        self.dropped = 0  # max_bytes'dan oshib tashlab yuborilganlar
+
+    def write(self, data):
+        with self.lock:
+            room = self.max_bytes - self.size
+            if len(data) > room:
+                self.dropped += len(data) - max(room, 0)
+                data = data[:max(room, 0)]
+            if not data:
+                return
+            if self.file is None and self.size + len(data) > self.spill_bytes:
+                if self.path:
+                    self.file = open(self.path, "w+b", buffering=0)
+                else:
+                    self.file = tempfile.TemporaryFile(prefix="job-", suffix=".log", buffering=0)
+                self.file.write(self.buffer)
+            if self.file is not None:
+                self.file.write(data)
+            self.buffer += data
+            self.size += len(data)
+            if self.file is not None and len(self.buffer) > self.ring_bytes:
+                del self.buffer[:len(self.buffer) - self.ring_bytes]
+
+    def read(self, offset, length):
+        """[offset, offset + length) oralig'ini qaytaradi"""
+        with self.lock:
+            offset = max(0, min(offset, self.size))
+            end = min(self.size, offset + max(0, length))
+            start = self.size - len(self.buffer)
+            if offset >= start:
+                return bytes(self.buffer[offset - start:end - start])
+            # Qulf ostida: close() fd'ni o'qish paytida yopib qo'ymasin
+            return os.pread(self.file.fileno(), end - offset, offset)
+
+    def tail(self, length):
+        size = self.size
+        return self.read(size - length, length)
+
+    def memory_copy(self):
+        """Xotirada turgan qism (faylga o'tilmagan bo'lsa - butun chiqish)"""
+        with self.lock:
+            return bytes(self.buffer)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                if self.path:
+                    try:
+                        os.unlink(self.path)
+                    except FileNotFoundError:
+                        pass
+            self.buffer = bytearray()
+            self.size = 0
+
+
+class SharedOutput:
+    """Boshqa worker jarayonidagi ish chiqishini o'qish uchun.
+
+    Log fayli bo'lsa undan o'qiladi, aks holda ish tugaganda bazaga
+    yozilgan oxirgi qismdan foydalaniladi.
+    """
+
+    def __init__(self, path, stored, size, dropped):
+        self.path = path
+        self.stored = stored or b""
+        self.stored_size = size
+        self.dropped = dropped
+
+    @property
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except (OSError, TypeError):
+            return self.stored_size
+
+    def read(self, offset, length):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(max(0, offset))
+                return f.read(max(0, length))
+        except (OSError, TypeError):
+            start = self.stored_size - len(self.stored)
+            offset = max(offset, start)
+            return self.stored[offset - start:offset - start + max(0, length)]
+
+    def tail(self, length):
+        size = self.size
+        return self.read(size - length, length)
+
+
+class Job:
+    """Bitta mavzu ishga tushirilishi: jarayon, holat va natija"""
+
+    def __init__(self, topic_id, file_path, priority=0):
+        self.id = uuid.uuid4().hex[:12]
+        self.topic_id = topic_id
+        self.file = file_path
+        self.priority = priority
+        # queued | running | finished | failed | cancelled | timeout
+        self.state = "queued"
+        self.exit_code = None
+        self.log_path = os.path.join(LOG_DIR, self.id + ".log")
+        self.output = OutputCapture(self.log_path)
+        self.cond = threading.Condition()
+        self.process = None
+        self.timer = None
+        self.counted = False  # running_count'da hisobga olinganmi
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def wait_output(self, seen, timeout):
+        """Chiqish `seen` dan oshishini yoki ish tugashini kutadi; timeout bo'lsa False"""
+        with self.cond:
+            if self.output.size <= seen and self.finished_at is None:
+                return self.cond.wait(timeout)
+        return True
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "topic_id": self.topic_id,
+            "file": self.file,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "queue_position": self.queue_position(),
+            "output": self.output.tail(STATUS_TAIL_BYTES).decode("utf-8", "replace"),
+            "output_size": self.output.size,
+            "output_dropped": self.output.dropped,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def queue_position(self):
+        """Navbatdagi o'rni (1 dan boshlab), navbatda bo'lmasa None"""
+        with process_lock:
+            for i, entry in enumerate(queue, 1):
+                if entry[2] is self:
+                    return i
+        return None
+
+
+class RemoteJob(Job):
+    """Boshqa worker jarayoni boshlagan ish (holati bazadan o'qiladi)"""
+
+    def __init__(self, row):
+        self.id = row["id"]
+        self.topic_id = row["topic_id"]
+        self.file = row["file"]
+        self.log_path = row["log_path"]
+        self.priority = row["priority"]
+        self.process = None
+        self._load(row)
+
+    def _load(self, row):
+        self.state = row["state"]
+        self.exit_code = row["exit_code"]
+        self.created_at = row["created_at"]
+        self.started_at = row["started_at"]
+        self.finished_at = row["finished_at"]
+        self.output = SharedOutput(self.log_path, row["output_tail"],
+                                   row["output_size"], row["output_dropped"])
+
+    def wait_output(self, seen, timeout):
+        deadline = time.monotonic() + timeout
+        while self.output.size <= seen and self.finished_at is None:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+            row = registry.get_job(self.id)
+            if row is None:
+                return True
+            self._load(row)
+        return True
+
+    def queue_position(self):
+        # Navbat boshqa worker xotirasida
+        return None
+
+
+def _watch(job):
+    """Jarayon chiqishini o'qiydi va tugashini kutadi (alohida oqimda)"""
+    while True:
+        data = job.process.stdout.read1(READ_CHUNK)
+        if not data:
+            break
+        job.output.write(data)
+        with job.cond:
+            job.cond.notify_all()
+    job.process.stdout.close()
+    exit_code = job.process.wait()
+    if job.timer:
+        job.timer.cancel()
+    with job.cond:
+        job.exit_code = exit_code
+        if job.state not in ("cancelled", "timeout"):
+            job.state = "finished" if exit_code == 0 else "failed"
+    _finish(job)
+
+
+def _finish(job):
+    """Ishni yakunlaydi: bazaga yozadi, kutayotganlarni uyg'otadi, navbatni suradi"""
+    finished_at = time.time()
+    with process_lock:
+        if job.counted:
+            job.counted = False
+            running_count[job.topic_id] -= 1
+
+    # Boshqa worker'lar ham natijani ko'rishi uchun avval bazaga yoziladi
+    output = job.output
+    stored = output.memory_copy()
+    try:
+        registry.finish_job(job.id, job.state, job.exit_code, finished_at,
+                            stored, output.size, output.dropped)
+    except Exception:
+        pass
+    with job.cond:
+        job.finished_at = finished_at
+        job.cond.notify_all()
+
+    topic = str(job.topic_id)
+    metrics.JOBS_FINISHED.inc(topic, job.state)
+    metrics.JOB_OUTPUT.observe(output.size, topic)
+    if job.started_at is not None:
+        metrics.JOB_DURATION.observe(finished_at - job.started_at, topic)
+    _dispatch()
+
+
+def follow(job, offset=0, keepalive=15):
+    """Ish chiqishini `offset` baytidan boshlab qatorma-qator kuzatadi.
+
+    (keyingi_offset, qator) juftliklarini beradi; `keepalive` soniya ichida
+    yangi qator bo'lmasa None beradi. Ish tugagach generator to'xtaydi.
+    Ma'lumot OutputCapture'dan bo'laklab o'qiladi, shuning uchun mijoz
+    qanchalik ortda qolmasin xotira sarfi chegaralangan.
+    """
+    seen = offset  # shu joygacha to'liq qator yo'q, yangi ma'lumot kutiladi
+    while True:
+        if not job.wait_output(seen, keepalive):
+            yield None
+            continue
+        done = job.finished_at is not None
+
+        data = job.output.read(offset, READ_CHUNK)
+        if not data:
+            if done:
+                return
+            continue
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            if not done and len(data) < READ_CHUNK:
+                # Qator hali tugamagan, davomini kutamiz
+                seen = offset + len(data)
+                continue
+            end = len(data)
+
+        for line in data[:end].splitlines(keepends=True):
+            offset += len(line)
+            yield offset, line.decode("utf-8", "replace")
+        seen = offset
+
+
+def _prune():
+    """Eski tugagan ishlarni o'chiradi (process_lock ushlangan holda chaqiriladi)"""
+    done = [j for j in jobs.values() if j.finished_at is not None]
+    if len(done) <= JOB_HISTORY:
+        return
+    done.sort(key=lambda j: j.finished_at)
+    for j in done[:len(done) - JOB_HISTORY]:
+        j.output.close()
+        del jobs[j.id]
+
+
+def _cancel_watcher():
+    """Boshqa worker'lardan kelgan to'xtatish so'rovlarini bajaradi"""
+    pid = os.getpid()
+    while True:
+        time.sleep(POLL_INTERVAL)
+        try:
+            requested = registry.cancel_requests(pid)
+        except Exception:
+            continue
+        for job_id in requested:
+            with process_lock:
+                job = jobs.get(job_id)
+            if job is not None:
+                cancel_job(job)
+
+
+_watcher_pid = None
+
+
+def _limits():
+    limits = {}
+    if CPU_LIMIT > 0:
+        limits["cpu"] = CPU_LIMIT
+    if MEMORY_LIMIT > 0:
+        limits["memory"] = MEMORY_LIMIT * 1024 * 1024
+    return limits
+
+
+def _spawn(file_path):
+    """Avval isitilgan hovuzdan fork qiladi, bo'lmasa yangi python jarayoni"""
+    limits = _limits()
+    pool = warm_pool.get_pool()
+    if pool is not None:
+        try:
+            return pool.spawn(file_path, limits=limits)
+        except Exception:
+            pass
+    return subprocess.Popen(
+        ['python', file_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        # Bola jarayon chiqishni qatorma-qator yuborishi uchun
+        env=dict(os.environ, PYTHONUNBUFFERED="1"),
+        preexec_fn=(lambda: warm_pool.apply_rlimits(limits)) if limits else None
+    )
+
+
+# ===================== REJALASHTIRUVCHI =====================
+def _take_ready():
+    """Cheklovlar ruxsat bergan ishlarni navbatdan oladi (process_lock ichida)"""
+    ready = []
+    total = sum(running_count.values())
+    for entry in list(queue):
+        if total >= MAX_RUNNING:
+            break
+        job = entry[2]
+        if running_count.get(job.topic_id, 0) >= MAX_PER_TOPIC:
+            continue
+        queue.remove(entry)
+        running_count[job.topic_id] = running_count.get(job.topic_id, 0) + 1
+        job.counted = True
+        job.state = "running"
+        total += 1
+        ready.append(job)
+    return ready
+
+
+def _dispatch():
+    """Navbatdagi ishlarni bo'sh joy bo'yicha ishga tushiradi"""
+    while True:
+        with process_lock:
+            ready = _take_ready()
+        if not ready:
+            return
+        for job in ready:
+            _launch(job)
+
+
+def _launch(job):
+    try:
+        process = _spawn(job.file)
+    except Exception as e:
+        job.output.write(f"Xatolik: {e}\n".encode())
+        job.state = "failed"
+        _finish(job)
+        return
+
+    job.process = process
+    job.started_at = time.time()
+    registry.mark_started(job.id, job.started_at)
+    if TIMEOUT > 0:
+        job.timer = threading.Timer(TIMEOUT, _expire, args=(job,))
+        job.timer.daemon = True
+        job.timer.start()
+    threading.Thread(target=_watch, args=(job,), daemon=True).start()
+
+    # Ishga tushayotgan paytda bekor qilingan bo'lsa
+    if job.state == "cancelled":
+        _stop(job)
+
+
+def _expire(job):
+    """Vaqt chegarasidan oshgan ishni to'xtatadi"""
+    if job.finished_at is None and job.state == "running":
+        job.state = "timeout"
+        registry.set_job_state(job.id, "timeout")
+        _stop(job)
+
+
+def _stop(job):
+    job.process.terminate()
+
+    def _kill():
+        if job.process.poll() is None:
+            job.process.kill()
+
+    timer = threading.Timer(KILL_GRACE, _kill)
+    timer.daemon = True
+    timer.start()
+
+
+def start_job(topic_id, file_path, priority=0):
+    """Ishni navbatga qo'yadi va darhol Job qaytaradi.
+
+    Katta `priority` oldinroq ishga tushadi, tenglar FIFO tartibida.
+    Navbat to'lgan bo'lsa QueueFull ko'tariladi.
+    """
+    global _watcher_pid
+    os.makedirs(LOG_DIR, exist_ok=True)
+    job = Job(topic_id, file_path, priority)
+    with process_lock:
+        if len(queue) >= QUEUE_LIMIT:
+            raise QueueFull()
+        _prune()
+        jobs[job.id] = job
+        if _watcher_pid != os.getpid():
+            _watcher_pid = os.getpid()
+            threading.Thread(target=_cancel_watcher, daemon=True).start()
+    registry.insert_job(job.id, topic_id, file_path, priority, os.getpid(),
+                        job.created_at, job.log_path)
+    registry.prune_jobs(JOB_HISTORY)
+
+    with process_lock:
+        bisect.insort(queue, (-priority, next(_queue_seq), job))
+    _dispatch()
+    return job
+
+
+def get_job(job_id):
+    """Shu worker'dagi ish yoki bazadagi boshqa worker ishi (topilmasa None)"""
+    with process_lock:
+        job = jobs.get(job_id)
+    if job is not None:
+        return job
+    row = registry.get_job(job_id)
+    return RemoteJob(row) if row is not None else None
+
+
+def cancel_job(job):
+    """Ishni to'xtatadi; KILL_GRACE ichida tugamasa majburan o'ldiradi"""
+    if job.state not in ("queued", "running"):
+        return False
+    if isinstance(job, RemoteJob):
+        # Ish boshqa worker'da - u so'rovni ko'rib o'zi to'xtatadi
+        return registry.request_cancel(job.id)
+
+    with process_lock:
+        entry = next((e for e in queue if e[2] is job), None)
+        if entry is not None:
+            queue.remove(entry)
+        job.state = "cancelled"
+    if entry is not None:
+        _finish(job)
+        return True
+
+    registry.set_job_state(job.id, "cancelled")
+    if job.process is not None:
+        _stop(job)
+    return True
+
+
+def cancel_topic_jobs(topic_id):
+    """Mavzuga tegishli barcha ishlayotgan ishlarni to'xtatadi"""
+    with process_lock:
+        running = [j for j in jobs.values() if j.topic_id == topic_id and j.finished_at is None]
+    for job in running:
+        cancel_job(job)
+    registry.request_cancel_topic(topic_id)
@@ -0,0 +1,161 @@
+"""LAN skanerning GUI'siz (Qt kerak emas) buyruq qatori versiyasi.
+
+Tarmoqlar qismlarga (shard) bo'linadi va bir nechta jarayonda
+tekshiriladi; har bir jarayon o'z probe tsikli bilan ishlaydi. Natijalar
+manzil bo'yicha saralangan bitta oqim sifatida chiqadi, shuning uchun
+cron'dan bir nechta /16 ni skanerlash mumkin:
+
+    python lanscan.py 10.1.0.0/16 10.2.0.0/16 --workers 8 > alive.txt
+
+Chiqish: har bir qator "ip<TAB>holat<TAB>rtt_ms<TAB>usul", yoki
+--format ndjson/csv bilan vaqt belgisi qo'shilgan yozuvlar (export.py).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import engines
+import export
+import iprange
+import ratecontrol
+
+# Bitta shard'dagi hostlar soni (/20)
+SHARD_SIZE = 4096
+
+
+def scan_shard(task):
+    """Worker jarayonida bitta shard'ni skanerlaydi, saralangan qatorlar qaytaradi"""
+    first, last, method, timeout, concurrency, rate, include_dead = task
+    hosts = iprange.HostRange.span(first, last)
+    seen_at = {}  # tirik host -> javob kelgan vaqt
+
+    def on_result(ip, alive, rtt_ms, name):
+        seen_at[ip] = time.time()
+
+    state, found = engines.sweep(hosts, method, concurrency, timeout, on_result=on_result,
+                                 report_dead=False, rate=rate)
+    finished = time.time()
+    rows = []
+    for index in range(len(hosts)):
+        info = found.get(index)
+        if info is not None:
+            rows.append((first + index, True) + info + (seen_at.get(hosts.ip(index), finished),))
+        elif include_dead:
+            rows.append((first + index, False, None, None, finished))
+    return rows
+
+
+def parse_networks(cidrs):
+    """CIDR'larni o'qiydi va ustma-ust tushganlarini olib tashlaydi.
+
+    Har bir tarmoq alohida tekshiriladi (hajm, tarmoq/broadcast manzillari);
+    qo'shni tarmoqlar birlashtirilmaydi, aks holda chegaradagi broadcast va
+    tarmoq manzillari ham skanerlanib qoladi.
+    """
+    ranges = sorted((iprange.HostRange(cidr) for cidr in cidrs),
+                    key=lambda hosts: (hosts.first, -hosts.last))
+    result = []
+    for hosts in ranges:
+        if result and hosts.first <= result[-1].last:
+            if hosts.last <= result[-1].last:
+                # Boshqa tarmoq ichida
+                continue
+            # Faqat chekkada (/31, /32) qisman ustma-ust tushishi mumkin
+            hosts = iprange.HostRange.span(result[-1].last + 1, hosts.last, hosts.network)
+        result.append(hosts)
+    return result
+
+
+def format_row(row):
+    addr, alive, rtt_ms, method, _ = row
+    rtt = f"{rtt_ms:.3f}" if rtt_ms is not None else "-"
+    return f"{iprange.int_to_ip(addr)}\t{'alive' if alive else 'dead'}\t{rtt}\t{method or '-'}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LAN skaner (GUI'siz, ko'p jarayonli)")
+    parser.add_argument("cidrs", nargs="+", help="Tarmoqlar, masalan 192.168.1.0/24")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Jarayonlar soni (standart: yadrolar soni)")
+    parser.add_argument("--method", default="auto", help="Probe'lar, masalan arp,icmp,tcp")
+    parser.add_argument("--timeout", type=float, default=engines.PING_TIMEOUT,
+                        help="Boshlang'ich (va eng katta) javob kutish vaqti, soniya")
+    parser.add_argument("--rate", type=float, default=ratecontrol.MAX_PPS,
+                        help="Umumiy paket/s chegarasi, jarayonlar o'rtasida bo'linadi (0 - cheksiz)")
+    parser.add_argument("--concurrency", type=int, default=engines.SWEEP_CONCURRENCY,
+                        help="ping jarayonlari usulida bir vaqtdagi so'rovlar")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--dead", action="store_true", help="Nofaol hostlarni ham chiqarish")
+    parser.add_argument("--format", choices=("text",) + export.FORMATS, default=None,
+                        help="Chiqish formati (standart: --output kengaytmasidan yoki text)")
+    parser.add_argument("--output", "-o", default="-", help="Chiqish fayli (standart: stdout)")
+    parser.add_argument("--save", action="store_true",
+                        help="Natijani host_store'ga yozish (qayta skaner uchun)")
+    args = parser.parse_args(argv)
+
+    try:
+        ranges = parse_networks(args.cidrs)
+        engines.make_probes(args.method)
+    except ValueError as e:
+        parser.error(str(e))
+
+    fmt = args.format or (export.format_for(args.output, "text") if args.output != "-" else "text")
+    if fmt == "text":
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        writer = None
+    else:
+        writer = export.open_writer(args.output, fmt)
+
+    workers = max(1, args.workers)
+    rate = args.rate / workers
+    tasks = [(shard.first, shard.last, args.method, args.timeout, args.concurrency, rate,
+              args.dead)
+             for hosts in ranges for shard in hosts.split(args.shard_size)]
+    started = time.time()
+    total = sum(len(hosts) for hosts in ranges)
+    alive = 0
+    found = {}
+
+    with multiprocessing.Pool(workers) as pool:
+        try:
+            # imap tartibni saqlaydi, shard'lar esa manzil bo'yicha saralangan
+            for rows in pool.imap(scan_shard, tasks):
+                for row in rows:
+                    if row[1]:
+                        alive += 1
+                        if args.save:
+                            found[row[0]] = row[2:4]
+                    if writer is not None:
+                        addr, is_alive, rtt_ms, method, seen = row
+                        writer.write(iprange.int_to_ip(addr), "alive" if is_alive else "dead",
+                                     rtt_ms, method, seen)
+                    else:
+                        out.write(format_row(row) + "\n")
+                if writer is None:
+                    out.flush()
+        except KeyboardInterrupt:
+            pool.terminate()
+            return 130
+        finally:
+            if writer is not None:
+                writer.close()
+            elif out is not sys.stdout:
+                out.close()
+
+    if args.save:
+        for hosts in ranges:
+            engines.record_sweep(
+                hosts,
+                {addr - hosts.first: info for addr, info in found.items()
+                 if hosts.first <= addr <= hosts.last},
+                started)
+
+    print(f"{total} ta host, {alive} ta faol, {len(tasks)} shard, "
+          f"{time.time() - started:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
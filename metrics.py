@@ -0,0 +1,191 @@
+"""Prometheus matn formatidagi oddiy metrikalar (tashqi kutubxonasiz).
+
+Histogram bucket'lari oldindan ajratiladi: kuzatish (observe) faqat
+bisect va ro'yxat elementini oshirishdan iborat, so'rov yo'lida yangi
+obyekt yaratilmaydi. Har bir worker jarayoni o'z metrikalarini beradi.
+"""
+import bisect
+import threading
+import time
+from functools import wraps
+
+# Soniyalar uchun standart bucket'lar
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+BYTES_BUCKETS = (1024, 16 * 1024, 128 * 1024, 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2)
+LOCK_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1)
+
+_metrics = []
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            items = list(self.values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labelnames=(), prealloc=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self.series = {}  # labels -> [bucket hisoblari..., +Inf, sum]
+        self.lock = threading.Lock()
+        for labels in prealloc:
+            self._series(labels)
+        _metrics.append(self)
+
+    def _series(self, labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        return series
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self._series(labels)
+            series[index] += 1
+            series[-1] += value
+
+    def labels(self, *labels):
+        """Yorliqlari oldindan bog'langan kuzatuvchi (issiq yo'l uchun)"""
+        with self.lock:
+            series = self._series(labels)
+        return _BoundHistogram(self, series)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            items = [(labels, list(series)) for labels, series in self.series.items()]
+        for labels, series in items:
+            names = self.labelnames + ("le",)
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {total}"
+            base = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{base} {_fmt(series[-1])}"
+            yield f"{self.name}_count{base} {total}"
+
+
+class _BoundHistogram:
+    def __init__(self, parent, series):
+        self.buckets = parent.buckets
+        self.lock = parent.lock
+        self.series = series
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.series[index] += 1
+            self.series[-1] += value
+
+
+class Gauge:
+    """Qiymati scrape paytida `collect()` orqali olinadigan gauge"""
+
+    def __init__(self, name, help, labelnames=(), collect=None):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.collect = collect
+        _metrics.append(self)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        if self.collect is None:
+            return
+        for labels, value in self.collect():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(value)}"
+
+
+class TimedLock:
+    """threading.Lock, kutish vaqti histogramga yoziladi"""
+
+    def __init__(self, histogram):
+        self._lock = threading.Lock()
+        self.histogram = histogram.labels()
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            start = time.perf_counter()
+            self._lock.acquire()
+            self.histogram.observe(time.perf_counter() - start)
+        else:
+            self.histogram.observe(0.0)
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed(route):
+    """Flask view funksiyasi uchun kechikishni REQUEST_LATENCY'ga yozadi"""
+    def decorator(view):
+        observer = REQUEST_LATENCY.labels(route)
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                observer.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ===================== ILOVA METRIKALARI =====================
+REQUEST_LATENCY = Histogram(
+    "launcher_request_duration_seconds", "Route bo'yicha so'rov kechikishi",
+    LATENCY_BUCKETS, ("route",), prealloc=[("index",), ("admin",), ("run_topic",), ("engine",)])
+JOBS_FINISHED = Counter(
+    "launcher_jobs_finished_total", "Yakunlangan ishlar (mavzu va holat bo'yicha)",
+    ("topic", "state"))
+JOB_DURATION = Histogram(
+    "launcher_job_duration_seconds", "Ish davomiyligi", DURATION_BUCKETS, ("topic",))
+JOB_OUTPUT = Histogram(
+    "launcher_job_output_bytes", "Ish chiqishi hajmi", BYTES_BUCKETS, ("topic",))
+LOCK_WAIT = Histogram(
+    "launcher_process_lock_wait_seconds", "process_lock'ni kutish vaqti", LOCK_BUCKETS)
+ENGINE_CACHE = Counter(
+    "launcher_engine_cache_total", "Dvigatel natijalari keshi (hit/miss/shared/bypass)",
+    ("engine", "result"))
@@ -0,0 +1,169 @@
+"""LAN skaner uchun hostning tirikligini aniqlash usullari (probe'lar).
+
+Har bir probe `run(hosts, on_alive, should_stop)` ko'rinishida: tirik deb
+topilgan hostlar uchun `on_alive(ip, rtt_ms)` chaqiriladi, qolganlari
+"aniqlanmagan" bo'lib, keyingi (qimmatroq) probe'ga o'tadi.
+"""
+import errno
+import os
+import selectors
+import socket
+import struct
+import time
+
+import icmp
+import ratecontrol
+
+# TCP probe uchun standart portlar (ssh, http, https, smb, netbios, rdp)
+TCP_PORTS = [int(p) for p in os.environ.get("TCP_PROBE_PORTS", "22,80,443,445,139,3389").split(",")]
+TCP_MAX_INFLIGHT = int(os.environ.get("TCP_PROBE_MAX_INFLIGHT", 512))
+
+ARP_TABLE = "/proc/net/arp"
+ATF_COMPLETE = 0x2
+
+
+def arp_neighbours(path=ARP_TABLE):
+    """Qo'shnilar jadvalidagi to'liq (MAC aniqlangan) yozuvlar IP'lari"""
+    neighbours = set()
+    try:
+        with open(path) as f:
+            next(f, None)  # sarlavha
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 4 and int(fields[2], 16) & ATF_COMPLETE \
+                        and fields[3] != "00:00:00:00:00:00":
+                    neighbours.add(fields[0])
+    except OSError:
+        pass
+    return neighbours
+
+
+class ArpProbe:
+    """Paket yubormaydi: yadro qo'shnilar jadvalidagi hostlar tirik"""
+    name = "arp"
+
+    def available(self):
+        return os.path.exists(ARP_TABLE)
+
+    def run(self, hosts, on_alive, should_stop=None):
+        # Jadval kichik: katta oraliqni aylanib chiqish o'rniga
+        # har bir qo'shni oraliqqa tegishlimi deb tekshiriladi
+        for ip in arp_neighbours():
+            if ip in hosts:
+                on_alive(ip, None)
+
+
+class IcmpProbe:
+    """Bitta soket orqali ICMP echo"""
+    name = "icmp"
+
+    def __init__(self, timeout=1.0, control=None):
+        self.timeout = timeout
+        self.control = control or ratecontrol.ScanControl(timeout)
+
+    def available(self):
+        return icmp.available()
+
+    def run(self, hosts, on_alive, should_stop=None):
+        def report(ip, alive, rtt_ms):
+            if alive:
+                on_alive(ip, rtt_ms)
+        # Natijalar ro'yxatga yig'ilmaydi - xotira tarmoq hajmiga bog'liq emas
+        with icmp.EchoSweep(timeout=self.timeout, control=self.control) as engine:
+            engine.run(hosts, report, should_stop)
+
+
+class TcpProbe:
+    """Bloklanmaydigan TCP connect: ulanish ham, RST (rad etish) ham - host tirik"""
+    name = "tcp"
+
+    def __init__(self, ports=None, timeout=1.0, max_inflight=TCP_MAX_INFLIGHT, control=None):
+        self.ports = ports or TCP_PORTS
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.control = control or ratecontrol.ScanControl(timeout)
+
+    def available(self):
+        return True
+
+    def run(self, hosts, on_alive, should_stop=None):
+        targets = ((ip, port) for ip in hosts for port in self.ports)
+        selector = selectors.DefaultSelector()
+        resolved = set()
+        # soket -> (ip, boshlangan vaqt, muddat, urinish). Muddat o'tganda ulanish
+        # yopilmaydi, balki keyingi urinish (backoff) muddatigacha kutiladi:
+        # SYN'ni yadro o'zi qayta yuboradi, kech javob ham qabul qilinadi
+        inflight = {}
+        bucket = self.control.bucket
+        exhausted = False
+        try:
+            while True:
+                if should_stop is not None and should_stop():
+                    return
+                while not exhausted and len(inflight) < self.max_inflight and bucket.take():
+                    target = next(targets, None)
+                    if target is None:
+                        exhausted = True
+                        break
+                    ip, port = target
+                    if ip in resolved:
+                        bucket.tokens += 1
+                        continue
+                    sock = self._connect(ip, port)
+                    if sock is True:
+                        resolved.add(ip)
+                        on_alive(ip, 0.0)
+                    elif sock is not None:
+                        now = time.monotonic()
+                        prefix = ip.rsplit(".", 1)[0]
+                        inflight[sock] = (ip, now, now + self.control.timeout_for(prefix), 0)
+                        selector.register(sock, selectors.EVENT_WRITE)
+                if exhausted and not inflight:
+                    return
+
+                wait = 0.05 if exhausted or len(inflight) >= self.max_inflight \
+                    else min(0.05, bucket.delay())
+                for key, _ in selector.select(timeout=wait):
+                    sock = key.fileobj
+                    ip, started, _, attempt = inflight.pop(sock)
+                    selector.unregister(sock)
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    sock.close()
+                    if error in (0, errno.ECONNREFUSED) and ip not in resolved:
+                        rtt = time.monotonic() - started
+                        self.control.observe(ip.rsplit(".", 1)[0], rtt, attempt)
+                        resolved.add(ip)
+                        on_alive(ip, rtt * 1000)
+
+                now = time.monotonic()
+                for sock, (ip, started, deadline, attempt) in list(inflight.items()):
+                    if ip not in resolved and now >= deadline and attempt < self.control.retries:
+                        prefix = ip.rsplit(".", 1)[0]
+                        inflight[sock] = (ip, started,
+                                          now + self.control.timeout_for(prefix, attempt + 1),
+                                          attempt + 1)
+                        continue
+                    # Oxirgi urinish muddati o'tgan yoki host allaqachon aniqlangan
+                    if ip in resolved or now >= deadline:
+                        del inflight[sock]
+                        selector.unregister(sock)
+                        sock.close()
+        finally:
+            for sock in inflight:
+                sock.close()
+            selector.close()
+
+    @staticmethod
+    def _connect(ip, port):
+        """Soket (kutilmoqda), True (darhol javob) yoki None (xato)"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        # Yopilganda TIME_WAIT qoldirmaslik uchun RST bilan yopiladi
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        code = sock.connect_ex((ip, port))
+        if code in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            return sock
+        sock.close()
+        if code in (0, errno.ECONNREFUSED):
+            return True
+        return None
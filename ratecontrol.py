@@ -0,0 +1,142 @@
+"""Skaner tezligini boshqarish: paketlar oqimi chegarasi, RTT asosidagi
+timeout va moslashuvchan qayta urinishlar soni.
+
+- TokenBucket: soniyasiga `rate` ta paketdan oshirmaydi (0 - cheklanmagan);
+- RttEstimator: javob kutish vaqti kuzatilgan RTT'larning yuqori
+  foizligidan (p95) hisoblanadi, shuning uchun eng tez hostlar sekinroq
+  (Wi-Fi, quvvat tejovchi) qurilmalar uchun timeout'ni kamaytirib yubormaydi;
+  har bir qayta urinishda timeout ikki barobar oshadi (backoff);
+- RetryPolicy: javoblar nechanchi urinishda kelayotganiga qarab qayta
+  urinishlar sonini oshiradi yoki kamaytiradi.
+"""
+import os
+import time
+
+import rttstats
+
+# Standart chegaralar (muhit o'zgaruvchilari orqali o'zgartiriladi)
+MAX_PPS = float(os.environ.get("SCAN_MAX_PPS", 10000))
+MIN_TIMEOUT = float(os.environ.get("SCAN_MIN_TIMEOUT", 0.1))
+MAX_RETRIES = int(os.environ.get("SCAN_MAX_RETRIES", 3))
+# Timeout = p95(RTT) * TIMEOUT_FACTOR; har bir qayta urinishda * BACKOFF
+TIMEOUT_PERCENTILE = 95
+TIMEOUT_FACTOR = 2.0
+BACKOFF = 2.0
+
+
+class TokenBucket:
+    def __init__(self, rate=MAX_PPS, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate / 20)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, count=1):
+        """Ruxsat berilgan paketlar soni (0..count)"""
+        if self.rate <= 0:
+            return count
+        self._refill()
+        allowed = min(count, int(self.tokens))
+        self.tokens -= allowed
+        return allowed
+
+    def delay(self):
+        """Keyingi paketgacha kutish kerak bo'lgan vaqt (soniya)"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RttEstimator:
+    """timeout = p95(RTT) * TIMEOUT_FACTOR, [min_timeout, max_timeout] ichida.
+
+    RTT'lar kichik (~70 bo'lakli, 25% aniqlikdagi) histogramda saqlanadi,
+    foizlik qiymat namunalar soni oshgan sari siyrakroq qayta hisoblanadi.
+    """
+
+    def __init__(self, initial=1.0, min_timeout=MIN_TIMEOUT, max_timeout=None):
+        self.initial = initial
+        self.min_timeout = min(min_timeout, initial)
+        self.max_timeout = max_timeout if max_timeout is not None else initial
+        self.histogram = rttstats.Histogram(low=0.01, precision=0.25)  # ms
+        self.samples = 0
+        self._timeout = initial
+        self._computed_at = 0
+
+    def observe(self, rtt):
+        """rtt - soniyalarda"""
+        self.histogram.add(rtt * 1000)
+        self.samples += 1
+
+    @property
+    def timeout(self):
+        if not self.samples:
+            return self.initial
+        if self.samples - self._computed_at >= max(1, self.samples // 16):
+            high = self.histogram.percentile(TIMEOUT_PERCENTILE) / 1000
+            self._timeout = min(self.max_timeout,
+                                max(self.min_timeout, high * TIMEOUT_FACTOR))
+            self._computed_at = self.samples
+        return self._timeout
+
+
+class RetryPolicy:
+    """Qayta urinishlar soni: javob k-urinishda kelgan bo'lsa, kamida k ta
+    qayta urinish kerak; uzoq vaqt faqat birinchi urinishga javob kelsa - kamaytiriladi.
+    """
+    WINDOW = 64
+
+    def __init__(self, initial=1, max_retries=MAX_RETRIES):
+        self.max_retries = max_retries
+        self.retries = min(initial, max_retries)
+        self.first_try = 0
+
+    def observe(self, attempt):
+        """attempt - javob kelgan urinish raqami (0 - birinchi yuborish)"""
+        if attempt > 0:
+            self.first_try = 0
+            self.retries = min(self.max_retries, max(self.retries, attempt + 1))
+            return
+        self.first_try += 1
+        if self.first_try >= self.WINDOW and self.retries > 0:
+            self.retries -= 1
+            self.first_try = 0
+
+
+class ScanControl:
+    """Bitta skaner uchun umumiy nazorat: tezlik, /24 bo'yicha RTT va qayta urinishlar"""
+
+    def __init__(self, timeout=1.0, rate=MAX_PPS, max_retries=MAX_RETRIES):
+        self.bucket = TokenBucket(rate)
+        self.timeout = timeout
+        self.overall = RttEstimator(timeout)
+        self.subnets = {}  # /24 prefiksi -> RttEstimator
+        self.retry = RetryPolicy(max_retries=max_retries)
+
+    def observe(self, prefix, rtt, attempt=0):
+        estimator = self.subnets.get(prefix)
+        if estimator is None:
+            estimator = self.subnets[prefix] = RttEstimator(self.timeout)
+        estimator.observe(rtt)
+        self.overall.observe(rtt)
+        self.retry.observe(attempt)
+
+    def timeout_for(self, prefix, attempt=0):
+        """Shu /24 uchun `attempt`-urinish timeout'i; namunalari bo'lmasa -
+        butun skaner bo'yicha. Qayta urinishlarda BACKOFF marta oshadi."""
+        estimator = self.subnets.get(prefix)
+        if estimator is None or estimator.samples < 2:
+            estimator = self.overall
+        return min(self.timeout, estimator.timeout * BACKOFF ** attempt)
+
+    @property
+    def retries(self):
+        return self.retry.retries
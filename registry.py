@@ -0,0 +1,235 @@
+"""Mavzular va ishlar uchun umumiy SQLite (WAL) ombori.
+
+Bir nechta gunicorn worker jarayoni bitta bazadan foydalanadi:
+- mavzu ID'lari AUTOINCREMENT orqali atomar ajratiladi;
+- mavzular o'zgarganda trigger `topics_version` ni oshiradi, har bir
+  worker o'z keshini shu raqam bo'yicha yangilaydi;
+- ishni boshqa worker to'xtatmoqchi bo'lsa `cancel_requested` belgilanadi,
+  ishni boshlagan worker uni davriy tekshirib to'xtatadi.
+"""
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.environ.get(
+    "TOPICS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "topics.db")
+)
+
+# Baza birinchi marta yaratilganda qo'shiladigan mavzular
+DEFAULT_TOPICS = [
+    (1, "IP manzillarni avtomatik skanerlovchi va faol hostlarni ko'rsatuvchi ilova", "topic2.py"),
+    (2, "Ping va traceroute buyruqlarini grafik interfeysda bajaruvchi dastur", "topic5.py"),
+    (3, "Tarmoqda foydalanuvchi ulanish holatini kuzatuvchi monitoring tizimi", "topic6.py"),
+    (4, "Lokal chat dasturi (LAN Messenger) – IP orqali xabar almashish", "topic7.py"),
+    (5, "Wi-Fi tarmoqlarini aniqlovchi va signal kuchini o'lchovchi dastur", "topic8.py"),
+    (6, "HTTP so'rovlarini log qiluvchi va statistik chiqaruvchi dastur", "topic12.py"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('topics_version', 0);
+
+CREATE TABLE IF NOT EXISTS topics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    file TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS topics_insert AFTER INSERT ON topics BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'topics_version';
+END;
+CREATE TRIGGER IF NOT EXISTS topics_update AFTER UPDATE ON topics BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'topics_version';
+END;
+CREATE TRIGGER IF NOT EXISTS topics_delete AFTER DELETE ON topics BEGIN
+    UPDATE meta SET value = value + 1 WHERE key = 'topics_version';
+END;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    topic_id INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    state TEXT NOT NULL,
+    exit_code INTEGER,
+    priority INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    log_path TEXT,
+    output_tail BLOB,
+    output_size INTEGER NOT NULL DEFAULT 0,
+    output_dropped INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_topic_state ON jobs (topic_id, state);
+CREATE INDEX IF NOT EXISTS jobs_worker_finished ON jobs (worker_pid, finished_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+# Jadval tuzilishi o'zgarganda oshiriladi (PRAGMA user_version)
+SCHEMA_VERSION = 2
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _init(conn):
+    """Jadval va triggerlarni yaratadi, bo'sh bazaga standart mavzularni qo'shadi"""
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        # Ishlar jadvali faqat vaqtinchalik tarix, uni qayta yaratish kifoya
+        conn.execute("DROP TABLE IF EXISTS jobs")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        seeded = conn.execute("SELECT value FROM meta WHERE key = 'seeded'").fetchone()
+        if seeded is None:
+            conn.executemany("INSERT OR IGNORE INTO topics (id, title, file) VALUES (?, ?, ?)",
+                             DEFAULT_TOPICS)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('seeded', 1)")
+
+        # Jarayoni o'lib ketgan worker'lardan qolgan tugallanmagan ishlar
+        for job_id, pid in conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE finished_at IS NULL").fetchall():
+            if not _pid_alive(pid):
+                conn.execute("UPDATE jobs SET state = 'failed', "
+                             "finished_at = COALESCE(started_at, created_at) WHERE id = ?",
+                             (job_id,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def connect():
+    """Joriy oqim uchun ulanish (har bir oqimga alohida)"""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+
+    conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None,
+                           check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with _init_lock:
+        if not _initialized:
+            _init(conn)
+            _initialized = True
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+# ===================== MAVZULAR =====================
+def topics_version():
+    row = connect().execute("SELECT value FROM meta WHERE key = 'topics_version'").fetchone()
+    return row[0]
+
+
+def list_topics():
+    rows = connect().execute("SELECT id, title, file FROM topics ORDER BY id").fetchall()
+    return {row["id"]: {"title": row["title"], "file": row["file"]} for row in rows}
+
+
+def get_topic(topic_id):
+    row = connect().execute("SELECT title, file FROM topics WHERE id = ?", (topic_id,)).fetchone()
+    if row is None:
+        return None
+    return {"title": row["title"], "file": row["file"]}
+
+
+def add_topic(title, file):
+    """Yangi mavzu qo'shadi va uning ID'sini qaytaradi"""
+    cur = connect().execute("INSERT INTO topics (title, file) VALUES (?, ?)", (title, file))
+    return cur.lastrowid
+
+
+def delete_topic(topic_id):
+    cur = connect().execute("DELETE FROM topics WHERE id = ?", (topic_id,))
+    return cur.rowcount > 0
+
+
+# ===================== ISHLAR =====================
+def insert_job(job_id, topic_id, file, priority, worker_pid, created_at, log_path):
+    connect().execute(
+        "INSERT INTO jobs (id, topic_id, file, state, priority, worker_pid, created_at, log_path) "
+        "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+        (job_id, topic_id, file, priority, worker_pid, created_at, log_path)
+    )
+
+
+def mark_started(job_id, started_at):
+    connect().execute(
+        "UPDATE jobs SET started_at = ?, "
+        "state = CASE WHEN state = 'queued' THEN 'running' ELSE state END WHERE id = ?",
+        (started_at, job_id))
+
+
+def finish_job(job_id, state, exit_code, finished_at, output_tail, output_size, output_dropped):
+    connect().execute(
+        "UPDATE jobs SET state = ?, exit_code = ?, finished_at = ?, output_tail = ?, "
+        "output_size = ?, output_dropped = ? WHERE id = ?",
+        (state, exit_code, finished_at, output_tail, output_size, output_dropped, job_id)
+    )
+
+
+def set_job_state(job_id, state):
+    connect().execute("UPDATE jobs SET state = ? WHERE id = ?", (state, job_id))
+
+
+def get_job(job_id):
+    return connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def request_cancel(job_id):
+    """Boshqa worker'dagi ishni to'xtatishni so'raydi"""
+    cur = connect().execute(
+        "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND finished_at IS NULL", (job_id,))
+    return cur.rowcount > 0
+
+
+def request_cancel_topic(topic_id):
+    connect().execute(
+        "UPDATE jobs SET cancel_requested = 1 WHERE topic_id = ? AND finished_at IS NULL",
+        (topic_id,))
+
+
+def cancel_requests(worker_pid):
+    """Shu worker'ga tegishli, to'xtatish so'ralgan ishlar ID'lari"""
+    rows = connect().execute(
+        "SELECT id FROM jobs WHERE worker_pid = ? AND finished_at IS NULL "
+        "AND cancel_requested = 1",
+        (worker_pid,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def prune_jobs(keep):
+    """Eng oxirgi `keep` tasidan eskiroq tugagan ishlarni va loglarini o'chiradi"""
+    conn = connect()
+    rows = conn.execute(
+        "SELECT id, log_path FROM jobs WHERE finished_at IS NOT NULL "
+        "ORDER BY finished_at DESC LIMIT -1 OFFSET ?", (keep,)).fetchall()
+    for row in rows:
+        conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+        if row["log_path"]:
+            try:
+                os.unlink(row["log_path"])
+            except OSError:
+                pass
@@ -0,0 +1,87 @@
+"""Dvigatel natijalari uchun TTL kesh.
+
+Kalit - dvigatel nomi va parametrlar. Yozuvlar o'z TTL'i tugaguncha
+yaroqli, umumiy hajm (JSON baytlarda) chegaradan oshsa eng uzoq
+ishlatilmagan yozuvlar chiqariladi (LRU). Bir xil so'rov bajarilayotgan
+paytda kelgan boshqa so'rovlar yangi ish boshlamaydi - o'sha ishning
+natijasini kutadi (single-flight).
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Keshning eng katta hajmi (bayt)
+MAX_BYTES = int(os.environ.get("RESULT_CACHE_BYTES", 16 * 1024 * 1024))
+
+
+def make_key(name, params):
+    return name + ":" + json.dumps(params, sort_keys=True, default=str)
+
+
+class ResultCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (expires_at, stored_at, size, result)
+        self.size = 0
+        self.inflight = {}  # key -> Future
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """(natija, yoshi_soniyada) yoki None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, stored_at, size, result = entry
+            now = time.monotonic()
+            if now >= expires_at:
+                del self.entries[key]
+                self.size -= size
+                return None
+            self.entries.move_to_end(key)
+            return result, now - stored_at
+
+    def put(self, key, result, ttl):
+        size = len(json.dumps(result, default=str).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.monotonic()
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            self.entries[key] = (now + ttl, now, size, result)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted, _) = self.entries.popitem(last=False)
+                self.size -= evicted
+
+    def flight(self, key, ttl, submit):
+        """Shu kalit uchun bajarilayotgan ishni qaytaradi yoki yangisini boshlaydi.
+
+        (future, yetakchimi) qaytaradi. Ish muvaffaqiyatli tugasa natija
+        keshga `ttl` soniyaga yoziladi.
+        """
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self.inflight[key] = submit()
+
+        def done(f):
+            # Avval keshga yoziladi, keyin ro'yxatdan olinadi - oradagi
+            # so'rov ishni qayta boshlamasligi uchun
+            if not f.cancelled() and f.exception() is None:
+                self.put(key, f.result(), ttl)
+            with self.lock:
+                if self.inflight.get(key) is f:
+                    del self.inflight[key]
+
+        future.add_done_callback(done)
+        return future, True
+
+    def stats(self):
+        with self.lock:
+            return len(self.entries), self.size
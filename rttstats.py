@@ -0,0 +1,147 @@
+"""RTT namunalari uchun oqimli statistika (xotira namunalar soniga bog'liq emas).
+
+- Histogram: logarifmik bo'laklar (HDR histogram g'oyasi), foizlik
+  qiymatlar (p50/p95/...) nisbiy `precision` xatolik bilan;
+- RttStats: yuborilgan/yo'qolgan, oxirgi/eng yaxshi/eng yomon, o'rtacha
+  va standart og'ish (Welford usuli), jitter (RFC 3550), hamda histogram.
+"""
+import math
+
+# Histogram chegaralari, ms: 1 mikrosekunddan 1 daqiqagacha
+LOW_MS = 0.001
+HIGH_MS = 60000.0
+PRECISION = 0.01
+
+
+class Histogram:
+    """Bo'lak chegaralari low * (1 + precision) ** i; hajmi o'zgarmas (~1800 bo'lak)"""
+
+    def __init__(self, low=LOW_MS, high=HIGH_MS, precision=PRECISION):
+        self.low = low
+        self.high = high
+        self.step = math.log1p(precision)
+        # 0 - `low` dan kichiklar, oxirgisi - `high` dan kattalar
+        self.size = int(math.log(high / low) / self.step) + 2
+        self.counts = [0] * (self.size + 1)
+        self.total = 0
+
+    def _index(self, value):
+        if value < self.low:
+            return 0
+        if value >= self.high:
+            return self.size
+        return min(self.size - 1, int(math.log(value / self.low) / self.step) + 1)
+
+    def _value(self, index):
+        """Bo'lakning o'rta (geometrik) qiymati"""
+        if index == 0:
+            return self.low
+        if index >= self.size:
+            return self.high
+        return self.low * math.exp((index - 0.5) * self.step)
+
+    def add(self, value):
+        self.counts[self._index(value)] += 1
+        self.total += 1
+
+    def percentile(self, q):
+        """q - 0..100; namuna bo'lmasa None"""
+        return self.percentiles(q)[0]
+
+    def percentiles(self, *qs):
+        """Bir nechta foizlik qiymat bitta o'tishda (qs o'sish tartibida)"""
+        if not self.total:
+            return [None] * len(qs)
+        ranks = [max(1, math.ceil(self.total * q / 100)) for q in qs]
+        values = []
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            while len(values) < len(ranks) and seen >= ranks[len(values)]:
+                values.append(self._value(index))
+            if len(values) == len(ranks):
+                break
+        return values + [self.high] * (len(ranks) - len(values))
+
+    def clear(self):
+        self.counts = [0] * (self.size + 1)
+        self.total = 0
+
+
+class RttStats:
+    """`add(rtt_ms)` - javob, `add(None)` - yo'qolgan paket"""
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.last = None
+        self.best = None
+        self.worst = None
+        self.mean = 0.0
+        self.m2 = 0.0  # Welford: o'rtachadan og'ishlar kvadratlari yig'indisi
+        self.jitter = 0.0
+        self.previous = None  # oldingi qabul qilingan RTT (jitter uchun)
+        self.histogram = Histogram()
+
+    def add(self, rtt_ms):
+        self.sent += 1
+        self.last = rtt_ms
+        if rtt_ms is None:
+            return
+        self.received += 1
+        delta = rtt_ms - self.mean
+        self.mean += delta / self.received
+        self.m2 += delta * (rtt_ms - self.mean)
+        if self.best is None or rtt_ms < self.best:
+            self.best = rtt_ms
+        if self.worst is None or rtt_ms > self.worst:
+            self.worst = rtt_ms
+        if self.previous is not None:
+            # RFC 3550, 6.4.1: J += (|D| - J) / 16
+            self.jitter += (abs(rtt_ms - self.previous) - self.jitter) / 16
+        self.previous = rtt_ms
+        self.histogram.add(rtt_ms)
+
+    @property
+    def lost(self):
+        return self.sent - self.received
+
+    @property
+    def loss_percent(self):
+        return self.lost / self.sent * 100 if self.sent else 0.0
+
+    @property
+    def avg(self):
+        return self.mean if self.received else None
+
+    @property
+    def stddev(self):
+        if self.received < 2:
+            return 0.0 if self.received else None
+        return math.sqrt(self.m2 / (self.received - 1))
+
+    def percentile(self, q):
+        return self.percentiles(q)[0]
+
+    def percentiles(self, *qs):
+        # Bo'lak o'rtasi haqiqiy chegaralardan chiqmasin
+        return [None if value is None else min(self.worst, max(self.best, value))
+                for value in self.histogram.percentiles(*qs)]
+
+    def snapshot(self):
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "lost": self.lost,
+            "loss_percent": self.loss_percent,
+            "last": self.last,
+            "avg": self.avg,
+            "best": self.best,
+            "worst": self.worst,
+            "stddev": self.stddev,
+            "jitter": self.jitter,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
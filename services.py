@@ -0,0 +1,202 @@
+"""Tirik hostlarda ochiq TCP portlarni (xizmatlarni) aniqlash.
+
+Bloklanmaydigan connect'lar bitta `selectors` tsiklida bajariladi:
+umumiy va har bir host uchun bir vaqtdagi ulanishlar chegaralangan,
+har bir ulanishga timeout bor. Ixtiyoriy ravishda ulanganidan keyin
+xizmat yuborgan birinchi baytlar (banner) o'qiladi.
+"""
+import collections
+import errno
+import os
+import selectors
+import socket
+import struct
+import time
+
+import ratecontrol
+
+DEFAULT_PORTS = os.environ.get(
+    "SERVICE_PORTS", "21,22,23,25,53,80,110,139,143,443,445,3306,3389,5432,8080")
+MAX_INFLIGHT = int(os.environ.get("SERVICE_MAX_INFLIGHT", 1024))
+PER_HOST = int(os.environ.get("SERVICE_PER_HOST", 64))
+BANNER_BYTES = 256
+
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+
+def parse_ports(spec):
+    """Port satrini (masalan "22,80,8000-8010") saralangan ro'yxatga aylantiradi"""
+    ports = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            low, high = (int(p) for p in part.split("-", 1))
+        else:
+            low = high = int(part)
+        if not 1 <= low <= high <= 65535:
+            raise ValueError(f"Noto'g'ri port: {part}")
+        ports.update(range(low, high + 1))
+    return sorted(ports)
+
+
+class _Conn:
+    __slots__ = ("sock", "ip", "port", "started", "deadline", "rtt", "banner")
+
+    def __init__(self, sock, ip, port, started, deadline):
+        self.sock = sock
+        self.ip = ip
+        self.port = port
+        self.started = started
+        self.deadline = deadline
+        self.rtt = None
+        self.banner = b""
+
+
+class ServiceScanner:
+    """`on_result(ip, port, holat, rtt_ms, banner)` har bir port uchun chaqiriladi"""
+
+    def __init__(self, ports, timeout=1.0, max_inflight=MAX_INFLIGHT, per_host=PER_HOST,
+                 banner=False, banner_bytes=BANNER_BYTES, banner_timeout=1.0,
+                 rate=ratecontrol.MAX_PPS):
+        self.ports = ports
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.per_host = per_host
+        self.banner = banner
+        self.banner_bytes = banner_bytes
+        self.banner_timeout = banner_timeout
+        self.bucket = ratecontrol.TokenBucket(rate)
+
+    def _connect(self, ip, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        # TIME_WAIT qoldirmaslik uchun RST bilan yopiladi
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        code = sock.connect_ex((ip, port))
+        return sock, code
+
+    def run(self, hosts, on_result, should_stop=None):
+        selector = selectors.DefaultSelector()
+        queues = collections.OrderedDict((ip, collections.deque(self.ports)) for ip in hosts)
+        host_inflight = collections.Counter()
+        conns = {}  # soket -> _Conn
+
+        def finish(conn, state):
+            selector.unregister(conn.sock)
+            conn.sock.close()
+            del conns[conn.sock]
+            host_inflight[conn.ip] -= 1
+            rtt_ms = conn.rtt * 1000 if conn.rtt is not None else None
+            banner = conn.banner.decode("utf-8", errors="replace").strip() if conn.banner else ""
+            on_result(conn.ip, conn.port, state, rtt_ms, banner)
+
+        def opened(conn, now):
+            conn.rtt = now - conn.started
+            if not self.banner:
+                finish(conn, OPEN)
+                return
+            # Banner kutish: xizmat birinchi bo'lib gapirishi mumkin
+            conn.deadline = now + self.banner_timeout
+            selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+        try:
+            while queues or conns:
+                if should_stop is not None and should_stop():
+                    return
+                # Hostlar navbatma-navbat: bitta host umumiy chegarani egallab olmasin
+                for ip in list(queues):
+                    if len(conns) >= self.max_inflight:
+                        break
+                    queue = queues[ip]
+                    while queue and host_inflight[ip] < self.per_host \
+                            and len(conns) < self.max_inflight and self.bucket.take():
+                        port = queue.popleft()
+                        sock, code = self._connect(ip, port)
+                        now = time.monotonic()
+                        if code in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 0):
+                            conn = _Conn(sock, ip, port, now, now + self.timeout)
+                            conns[sock] = conn
+                            host_inflight[ip] += 1
+                            selector.register(sock, selectors.EVENT_WRITE, conn)
+                            if code == 0:
+                                opened(conn, now)
+                        else:
+                            sock.close()
+                            on_result(ip, port, CLOSED if code == errno.ECONNREFUSED else FILTERED,
+                                      None, "")
+                    if not queue:
+                        del queues[ip]
+
+                if not conns:
+                    if queues:
+                        time.sleep(self.bucket.delay())
+                    continue
+
+                wait = 0.05 if not queues else min(0.05, self.bucket.delay())
+                now = time.monotonic()
+                for key, events in selector.select(timeout=wait):
+                    conn = key.data
+                    if conn.rtt is None:
+                        error = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                        if error == 0:
+                            opened(conn, now)
+                        else:
+                            finish(conn, CLOSED if error == errno.ECONNREFUSED else FILTERED)
+                        continue
+                    # Banner o'qish
+                    try:
+                        data = conn.sock.recv(self.banner_bytes - len(conn.banner))
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    except OSError:
+                        data = b""
+                    conn.banner += data
+                    if not data or len(conn.banner) >= self.banner_bytes:
+                        finish(conn, OPEN)
+
+                now = time.monotonic()
+                for conn in [c for c in conns.values() if c.deadline <= now]:
+                    # Ulanish muddati tugadi (filtered) yoki banner kutish tugadi (open)
+                    finish(conn, OPEN if conn.rtt is not None else FILTERED)
+        finally:
+            for sock in conns:
+                sock.close()
+            selector.close()
+
+
+def scan_services(hosts, ports=DEFAULT_PORTS, timeout=1.0, max_inflight=MAX_INFLIGHT,
+                  per_host=PER_HOST, banner=False, banner_bytes=BANNER_BYTES,
+                  rate=ratecontrol.MAX_PPS, on_result=None, should_stop=None):
+    """Hostlardagi ochiq portlarni aniqlaydi.
+
+    `hosts` - manzillar ro'yxati yoki vergul bilan ajratilgan satr,
+    `ports` - ro'yxat yoki "22,80,8000-8010" ko'rinishidagi satr.
+    Har bir host uchun ochiq portlar va yopiq/filtrlangan portlar sonini qaytaradi.
+    """
+    if isinstance(hosts, str):
+        hosts = [h.strip() for h in hosts.split(",") if h.strip()]
+    if isinstance(ports, str):
+        ports = parse_ports(ports)
+    results = {ip: {"open": [], CLOSED: 0, FILTERED: 0} for ip in hosts}
+
+    def collect(ip, port, state, rtt_ms, banner):
+        if state == OPEN:
+            entry = {"port": port, "rtt_ms": rtt_ms}
+            if banner:
+                entry["banner"] = banner
+            results[ip]["open"].append(entry)
+        else:
+            results[ip][state] += 1
+        if on_result:
+            on_result(ip, port, state, rtt_ms, banner)
+
+    scanner = ServiceScanner(ports, timeout, max_inflight, per_host, banner, banner_bytes,
+                             rate=rate)
+    scanner.run(results.keys(), collect, should_stop)
+    for info in results.values():
+        info["open"].sort(key=lambda entry: entry["port"])
+    return {"ports": len(ports), "hosts": results}
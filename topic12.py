@@ -1,13 +1,12 @@
 # http_analyzer_stdlib.py
 import sys
-import http.client
-import urllib.parse
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit, QMessageBox
 )
 from PyQt5.QtCore import Qt
-import time
+
+import engines
 
 class HTTPAnalyzer(QWidget):
     def __init__(self):
@@ -58,45 +57,27 @@ class HTTPAnalyzer(QWidget):
             return
 
         try:
-            parsed_url = urllib.parse.urlparse(url)
-            scheme = parsed_url.scheme
-            host = parsed_url.hostname
-            path = parsed_url.path if parsed_url.path else "/"
-            port = parsed_url.port
-            if not port:
-                port = 443 if scheme == "https" else 80
-
-            start_time = time.time()
-            if scheme == "https":
-                conn = http.client.HTTPSConnection(host, port, timeout=10)
-            else:
-                conn = http.client.HTTPConnection(host, port, timeout=10)
-
-            conn.request("GET", path)
-            response = conn.getresponse()
-            elapsed_time = time.time() - start_time
-            body = response.read().decode('utf-8', errors='replace')
+            result = engines.analyze_http(url)
 
             output = f"=== HTTP SO'ROV TAHLILI ===\n\n"
             output += f"URL: {url}\n\n"
 
             # Request ma'lumotlari
             output += "=== SO'ROV (REQUEST) ===\n"
-            output += f"Method: GET\n"
-            output += f"Host: {host}\n"
-            output += f"Path: {path}\n\n"
+            output += f"Method: {result['method']}\n"
+            output += f"Host: {result['host']}\n"
+            output += f"Path: {result['path']}\n\n"
 
             # Response ma'lumotlari
             output += "=== JAVOB (RESPONSE) ===\n"
-            output += f"Kod: {response.status} ({self.get_status_description(response.status)})\n"
-            headers = {k:v for k,v in response.getheaders()}
-            output += f"Headers: {headers}\n"
-            output += f"Body: {body[:1000]}{'...' if len(body) > 1000 else ''}\n\n"
+            output += f"Kod: {result['status']} ({result['status_description']})\n"
+            output += f"Headers: {result['headers']}\n"
+            output += f"Body: {result['body']}{'...' if result['body_truncated'] else ''}\n\n"
 
             output += "=== TAHLIL NATIJASI ===\n"
-            output += f"- So'rov muvaffaqiyatli: {'Ha' if 200 <= response.status < 400 else 'Yo‘q'}\n"
-            output += f"- Vaqt: {elapsed_time:.2f} soniya\n"
-            output += f"- Hajm: {len(body.encode('utf-8'))} bayt\n"
+            output += f"- So'rov muvaffaqiyatli: {'Ha' if result['ok'] else 'Yo‘q'}\n"
+            output += f"- Vaqt: {result['elapsed']:.2f} soniya\n"
+            output += f"- Hajm: {result['size']} bayt\n"
 
             self.output_text.setText(output)
 
@@ -106,16 +87,7 @@ class HTTPAnalyzer(QWidget):
             QMessageBox.critical(self, "Xato", error_msg)
 
     def get_status_description(self, code):
-        descriptions = {
-            200: "OK - Muvaffaqiyatli",
-            201: "Created - Yaratildi",
-            400: "Bad Request - Noto'g'ri so'rov",
-            401: "Unauthorized - Ruxsatsiz",
-            403: "Forbidden - Taqiqlangan",
-            404: "Not Found - Topilmadi",
-            500: "Internal Server Error - Server xatosi"
-        }
-        return descriptions.get(code, "Noma'lum")
+        return engines.get_status_description(code)
 
     def clear_output(self):
         self.output_text.clear()
@@ -1,56 +1,324 @@
 # lan_scanner.py
+import bisect
 import sys
-import subprocess
-import platform
-import ipaddress
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QTextEdit, QProgressBar, QMessageBox
+    QLabel, QLineEdit, QPushButton, QProgressBar, QMessageBox,
+    QCheckBox, QTableView, QHeaderView, QAbstractItemView, QFileDialog
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import (
+    Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
+)
+from PyQt5.QtGui import QColor
+
+import engines
+import export
+import host_store
+import iprange
+import services
+
+
+# Natijalar GUI'ga shu oraliqda (soniya) bir to'plam bo'lib yuboriladi (~30 kadr/s)
+FLUSH_INTERVAL = 1 / 30
+
+# Jadvaldagi holat matnlari
+STATE_TEXT = {
+    "alive": "✅ faol",
+    "dead": "❌ nofaol",
+    "new": "🆕 yangi",
+    "gone": "❌ yo'qolgan",
+    "changed": "🔄 o'zgargan",
+}
+ALIVE_STATES = ("alive", "new", "changed")
 
 
 class PingThread(QThread):
-    update_signal = pyqtSignal(str)
+    results_signal = pyqtSignal(list)  # [(ip, holat, rtt_ms, usul), ...]
+    services_signal = pyqtSignal(list)  # [(ip, port, banner), ...] - ochiq portlar
     progress_signal = pyqtSignal(int)
+    error_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
 
-    def __init__(self, ip_list):
+    def __init__(self, hosts, concurrency=engines.SWEEP_CONCURRENCY, rescan=False,
+                 export_path=None, ports=None, banner=False):
         super().__init__()
-        self.ip_list = ip_list
+        self.hosts = hosts
+        self.concurrency = concurrency
+        self.rescan = rescan
+        self.export_path = export_path
+        self.ports = ports  # None - xizmatlar tekshirilmaydi
+        self.banner = banner
+        self.writer = None
         self.is_running = True
+        self.buffer = []
+        self.service_buffer = []
+        self.alive = []  # portlari tekshiriladigan tirik hostlar
+        self.last_flush = 0.0
 
     def run(self):
-        total = len(self.ip_list)
-        for i, ip in enumerate(self.ip_list, 1):
-            if not self.is_running:
-                break
-
-            alive = self.ping(ip)
-            if alive:
-                self.update_signal.emit(f"✅ {ip} is active")
-            else:
-                self.update_signal.emit(f"❌ {ip} is inactive")
-
-            self.progress_signal.emit(int(i / total * 100))
-        self.finished_signal.emit()
-
-    def ping(self, ip):
-        param = '-n' if platform.system().lower() == 'windows' else '-c'
+        # Xato bo'lsa ham finished_signal chiqadi - aks holda tugmalar bloklanib qoladi
         try:
-            result = subprocess.run(
-                ['ping', param, '1', ip],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+            if self.export_path:
+                # Natijalar kelishi bilan faylga yoziladi (NDJSON yoki CSV)
+                self.writer = export.open_writer(self.export_path)
+            self.scan()
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            if self.writer is not None:
+                try:
+                    self.writer.close()
+                except Exception as e:
+                    self.error_signal.emit(str(e))
+            self.flush()
+            self.finished_signal.emit()
+
+    def scan(self):
+        if self.rescan:
+            # Oldingi natijalar asosida: faqat yangi, yo'qolgan va o'zgargan hostlar
+            engines.rescan_subnet(
+                str(self.hosts.network),
+                concurrency=self.concurrency,
+                on_change=self.report_change,
+                on_progress=self.progress,
+                should_stop=lambda: not self.is_running
             )
-            return result.returncode == 0
-        except Exception:
-            return False
+            if self.ports and self.is_running:
+                # O'zgarmagan tirik hostlar hodisa bermaydi - ro'yxat bazadan olinadi
+                known = host_store.known_hosts(self.hosts)
+                self.alive = sorted((ip for ip, row in known.items() if row["alive"]),
+                                    key=iprange.ip_to_int)
+        else:
+            # Avval arzon usullar (ARP jadvali, ICMP), faqat aniqlanmagan hostlar
+            # uchun TCP connect; natijalar kelish tartibida chiqadi
+            started = time.time()
+            state, found = engines.sweep(
+                self.hosts,
+                concurrency=self.concurrency,
+                on_result=self.report,
+                on_progress=self.progress,
+                should_stop=lambda: not self.is_running
+            )
+            if self.is_running:
+                engines.record_sweep(self.hosts, found, started)
+        if self.ports and self.alive and self.is_running:
+            self.scan_services()
+
+    def scan_services(self):
+        # Tirik hostlarda ochiq portlar; natijalar shu jadvalga oqim bo'lib keladi
+        self.flush()
+        self.progress_signal.emit(0)
+        total = len(self.alive) * len(self.ports)
+        done = 0
+
+        def on_result(ip, port, state, rtt_ms, banner):
+            nonlocal done
+            done += 1
+            if state == services.OPEN:
+                self.service_buffer.append((ip, port, banner))
+            if time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+                self.progress_signal.emit(done * 100 // total)
+                self.flush()
+
+        scanner = services.ServiceScanner(self.ports, banner=self.banner)
+        scanner.run(self.alive, on_result, should_stop=lambda: not self.is_running)
+
+    def report(self, ip, alive, rtt_ms=None, method=None):
+        if alive:
+            self.alive.append(ip)
+        self.add(ip, "alive" if alive else "dead", rtt_ms, method)
+
+    def report_change(self, kind, ip, rtt_ms=None, method=None):
+        self.add(ip, kind, rtt_ms, method)
+
+    def add(self, ip, state, rtt_ms, method):
+        if self.writer is not None:
+            self.writer.write(ip, state, rtt_ms, method)
+        self.buffer.append((ip, state, rtt_ms, method))
+        self.maybe_flush()
+
+    def progress(self, percent):
+        self.progress_signal.emit(percent)
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        # Har bir host uchun alohida signal o'rniga bitta to'plam
+        self.last_flush = time.monotonic()
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.results_signal.emit(batch)
+        if self.service_buffer:
+            batch, self.service_buffer = self.service_buffer, []
+            self.services_signal.emit(batch)
 
     def stop(self):
         self.is_running = False
 
 
+class _Descending:
+    """Kamayish tartibida bisect uchun: taqqoslash teskari"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class HostTableModel(QAbstractTableModel):
+    """Skaner natijalari jadvali.
+
+    View faqat ko'rinadigan qatorlarni so'raydi. Saralash va filtr
+    Python ro'yxatlarida bajariladi (har bir taqqoslashda Qt orqali
+    data() chaqirilmaydi), shuning uchun o'n minglab qatorda ham tez.
+    """
+    HEADERS = ["Manzil", "Holat", "RTT (ms)", "Usul", "Xizmatlar"]
+    SORT_KEYS = [
+        lambda row: row[0],
+        lambda row: row[2],
+        lambda row: row[3] if row[3] is not None else float("inf"),
+        lambda row: row[4] or "",
+    ]
+    SERVICES_COLUMN = 4
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []  # barcha natijalar: (ip_int, ip, holat, rtt_ms, usul)
+        self.view = []  # filtrdan o'tgan, saralangan qatorlar
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+        self.filter_text = ""
+        self.alive_only = False
+        self.services = {}  # ip_int -> ["22 (SSH-2.0-...)", "80", ...]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ip_int, ip, state, rtt_ms, method = self.view[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return ip
+            if column == 1:
+                return STATE_TEXT.get(state, state)
+            if column == 2:
+                return f"{rtt_ms:.2f}" if rtt_ms is not None else ""
+            if column == self.SERVICES_COLUMN:
+                return ", ".join(self.services.get(ip_int, ()))
+            return method or ""
+        if role == Qt.ForegroundRole and column == 1:
+            return QColor("#00ff9f") if state in ALIVE_STATES else QColor("#ff6b6b")
+        return None
+
+    def accepts(self, row):
+        if self.alive_only and row[2] not in ALIVE_STATES:
+            return False
+        text = self.filter_text
+        return not text or text in row[1] or text in (row[4] or "") or text in row[2]
+
+    def _sort_key(self, column):
+        if column == self.SERVICES_COLUMN:
+            return lambda row: len(self.services.get(row[0], ()))
+        return self.SORT_KEYS[column]
+
+    def _sort_view(self):
+        if self.sort_column >= 0:
+            self.view.sort(key=self._sort_key(self.sort_column),
+                           reverse=self.sort_order == Qt.DescendingOrder)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self._sort_view()
+        self.layoutChanged.emit()
+
+    def set_filter(self, text, alive_only):
+        self.beginResetModel()
+        self.filter_text = text.lower()
+        self.alive_only = alive_only
+        self.view = [row for row in self.rows if self.accepts(row)]
+        self._sort_view()
+        self.endResetModel()
+
+    def add_rows(self, batch):
+        """To'plamni saralangan ko'rinishga qo'shadi.
+
+        Butun ro'yxat qayta saralanmaydi: faqat to'plam saralanadi va
+        bisect bilan joyiga qo'yiladi, har bir uzluksiz bo'lak uchun bitta
+        beginInsertRows. Tartibli skanerda bu oxiriga bitta qo'shish.
+        """
+        rows = [(iprange.ip_to_int(ip), ip, state, rtt_ms, method)
+                for ip, state, rtt_ms, method in batch]
+        self.rows.extend(rows)
+        visible = [row for row in rows if self.accepts(row)]
+        if not visible:
+            return
+        if self.sort_column < 0:
+            self._insert(len(self.view), visible)
+            return
+
+        key = self._sort_key(self.sort_column)
+        if self.sort_order == Qt.DescendingOrder:
+            key = lambda row, base=key: _Descending(base(row))
+        visible.sort(key=key)
+        # Joylar asl ro'yxat bo'yicha hisoblanadi, qo'shish oxiridan boshlanadi
+        runs = []
+        for row in visible:
+            position = bisect.bisect_right(self.view, key(row), key=key)
+            if runs and runs[-1][0] == position:
+                runs[-1][1].append(row)
+            else:
+                runs.append((position, [row]))
+        for position, run in reversed(runs):
+            self._insert(position, run)
+
+    def _insert(self, position, rows):
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        self.view[position:position] = rows
+        self.endInsertRows()
+
+    def add_services(self, batch):
+        """Ochiq portlarni qo'shadi; faqat "Xizmatlar" ustuni yangilanadi"""
+        for ip, port, banner in batch:
+            text = f"{port} ({banner[:40]})" if banner else str(port)
+            self.services.setdefault(iprange.ip_to_int(ip), []).append(text)
+        if self.view:
+            self.dataChanged.emit(self.index(0, self.SERVICES_COLUMN),
+                                  self.index(len(self.view) - 1, self.SERVICES_COLUMN))
+        if self.sort_column == self.SERVICES_COLUMN:
+            self.layoutAboutToBeChanged.emit()
+            self._sort_view()
+            self.layoutChanged.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.view = []
+        self.services = {}
+        self.endResetModel()
+
+    def alive_count(self):
+        return sum(1 for row in self.rows if row[2] in ALIVE_STATES)
+
+
 class LANScanner(QWidget):
     def __init__(self):
         super().__init__()
@@ -61,7 +329,8 @@ class LANScanner(QWidget):
             QLineEdit { background-color: #2d2d2d; border: 1px solid #00ff9f; padding: 5px; }
             QPushButton { background-color: #00aa88; color: white; font-weight: bold; padding: 8px; border: none; }
             QPushButton:hover { background-color: #00ff9f; }
-            QTextEdit { background-color: #2d2d2d; border: 1px solid #00ff9f; padding: 5px; }
+            QTableView { background-color: #2d2d2d; border: 1px solid #00ff9f; gridline-color: #3d3d3d; }
+            QHeaderView::section { background-color: #2d2d2d; color: #00ff9f; border: none; padding: 4px; }
             QProgressBar { background-color: #2d2d2d; border: 1px solid #00ff9f; text-align: center; }
             QProgressBar::chunk { background-color: #00ff9f; }
         """)
@@ -91,18 +360,65 @@ class LANScanner(QWidget):
         btn_layout.addWidget(self.clear_btn)
         layout.addLayout(btn_layout)
 
+        # Qayta skaner rejimi va eksport
+        options_layout = QHBoxLayout()
+        self.rescan_check = QCheckBox("Qayta skaner (faqat o'zgarishlar)")
+        options_layout.addWidget(self.rescan_check)
+        self.export_btn = QPushButton("Eksport...")
+        self.export_btn.clicked.connect(self.choose_export)
+        options_layout.addWidget(self.export_btn)
+        self.export_label = QLabel("")
+        options_layout.addWidget(self.export_label)
+        layout.addLayout(options_layout)
+
+        # Tirik hostlarda ochiq portlarni (xizmatlarni) aniqlash
+        services_layout = QHBoxLayout()
+        self.services_check = QCheckBox("Portlarni tekshirish")
+        services_layout.addWidget(self.services_check)
+        self.ports_input = QLineEdit(services.DEFAULT_PORTS)
+        services_layout.addWidget(self.ports_input)
+        self.banner_check = QCheckBox("Banner")
+        services_layout.addWidget(self.banner_check)
+        layout.addLayout(services_layout)
+        self.export_path = None
+
         # Progress bar
         self.progress = QProgressBar()
         self.progress.setValue(0)
         layout.addWidget(self.progress)
 
-        # Output
-        self.output_text = QTextEdit()
-        self.output_text.setReadOnly(True)
-        layout.addWidget(self.output_text)
+        # Filtrlar
+        filter_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filtr (manzil, usul...)")
+        self.filter_input.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.filter_input)
+        self.alive_only_check = QCheckBox("Faqat faollar")
+        self.alive_only_check.toggled.connect(self.apply_filter)
+        filter_layout.addWidget(self.alive_only_check)
+        layout.addLayout(filter_layout)
+
+        # Natijalar jadvali (model/view: faqat ko'rinadigan qatorlar chiziladi)
+        self.model = HostTableModel()
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        # Qator balandligi bir xil - uzun jadvalda o'lchash kerak bo'lmaydi
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
 
         self.setLayout(layout)
         self.thread = None
+        self.scan_error = None
 
     def start_scan(self):
         subnet = self.subnet_input.text().strip()
@@ -111,18 +427,32 @@ class LANScanner(QWidget):
             return
 
         try:
-            net = ipaddress.ip_network(subnet, strict=False)
-            ip_list = [str(ip) for ip in net.hosts()]
-        except ValueError:
-            QMessageBox.critical(self, "Xato", "Noto‘g‘ri subnet format!")
+            # Manzillar ro'yxati yaratilmaydi - oraliq butun sonlar bilan saqlanadi
+            hosts = iprange.HostRange(subnet)
+        except ValueError as e:
+            QMessageBox.critical(self, "Xato", f"Noto‘g‘ri subnet format!\n{e}")
             return
 
-        self.output_text.clear()
+        ports = None
+        if self.services_check.isChecked():
+            try:
+                ports = services.parse_ports(self.ports_input.text())
+            except ValueError as e:
+                QMessageBox.critical(self, "Xato", f"Noto‘g‘ri portlar!\n{e}")
+                return
+
+        self.model.clear()
+        self.status_label.setText("")
+        self.scan_error = None
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
-        self.thread = PingThread(ip_list)
-        self.thread.update_signal.connect(self.add_result)
+        self.thread = PingThread(hosts, rescan=self.rescan_check.isChecked(),
+                                 export_path=self.export_path, ports=ports,
+                                 banner=self.banner_check.isChecked())
+        self.thread.results_signal.connect(self.add_results)
+        self.thread.services_signal.connect(self.model.add_services)
         self.thread.progress_signal.connect(self.progress.setValue)
+        self.thread.error_signal.connect(self.scan_failed)
         self.thread.finished_signal.connect(self.scan_finished)
         self.thread.start()
 
@@ -133,17 +463,37 @@ class LANScanner(QWidget):
             self.start_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
 
-    def add_result(self, text):
-        self.output_text.append(text)
+    def choose_export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Natijalarni eksport qilish", "scan.ndjson",
+            "NDJSON (*.ndjson *.jsonl);;CSV (*.csv)")
+        self.export_path = path or None
+        self.export_label.setText(path)
+
+    def add_results(self, batch):
+        self.model.add_rows(batch)
+        self.status_label.setText(f"Natijalar: {len(self.model.rows)}")
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter_input.text().strip(),
+                              self.alive_only_check.isChecked())
+
+    def scan_failed(self, message):
+        self.scan_error = message
 
     def scan_finished(self):
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
+        if self.scan_error:
+            self.status_label.setText(f"❌ Xatolik: {self.scan_error}")
+            return
         self.progress.setValue(100)
-        self.output_text.append("✅ Scan tugadi!")
+        self.status_label.setText(
+            f"✅ Scan tugadi! Natijalar: {len(self.model.rows)}, faol: {self.model.alive_count()}")
 
     def clear_output(self):
-        self.output_text.clear()
+        self.model.clear()
+        self.status_label.setText("")
         self.progress.setValue(0)
         self.subnet_input.clear()
 
@@ -1,80 +1,52 @@
+import os
 import sys
-import subprocess
-import platform
-import re
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
-                             QTextEdit, QTabWidget, QSpinBox, QGroupBox,
-                             QProgressBar, QFrame, QScrollArea)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QIcon, QPalette, QColor, QLinearGradient
+                             QTextEdit, QTabWidget, QSpinBox, QDoubleSpinBox, QGroupBox,
+                             QProgressBar, QFrame, QCheckBox, QListView,
+                             QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate)
+from PyQt5.QtCore import (QThread, pyqtSignal, Qt, QTimer, QPropertyAnimation, QEasingCurve,
+                          QAbstractTableModel, QAbstractListModel, QModelIndex, QSize)
+from PyQt5.QtGui import (QFont, QFontMetrics, QIcon, QPalette, QColor, QLinearGradient,
+                         QPainter)
+
+import engines
+import icmp
+
+# Ro'yxatda saqlanadigan oxirgi natijalar soni (eskilari o'chiriladi)
+RESULT_HISTORY = int(os.environ.get("RESULT_HISTORY", 5000))
+# Yangi qatorlar shu oraliqda (ms) bitta to'plam bo'lib qo'shiladi (~30 kadr/s)
+FLUSH_INTERVAL_MS = 33
 
 
 class PingThread(QThread):
     update_signal = pyqtSignal(str, bool, float)  # text, success, time
     progress_signal = pyqtSignal(int)
+    stats_signal = pyqtSignal(dict)  # jonli statistika (siyraklashtirilgan)
     finished_signal = pyqtSignal(dict)
 
-    def __init__(self, host, count):
+    def __init__(self, host, count, interval=1.0, size=icmp.PAYLOAD_SIZE,
+                 timeout=engines.PING_TIMEOUT):
         super().__init__()
         self.host = host
         self.count = count
+        self.interval = interval
+        self.size = size
+        self.timeout = timeout
         self.is_running = True
 
     def run(self):
         try:
-            param = '-n' if platform.system().lower() == 'windows' else '-c'
-            command = ['ping', param, str(self.count), self.host]
-
-            process = subprocess.Popen(command, stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       universal_newlines=True)
-
-            packet_num = 0
-            times = []
-            success_count = 0
-
-            for line in process.stdout:
-                if not self.is_running:
-                    process.terminate()
-                    break
-
-                # Parse ping results
-                if 'time=' in line.lower() or 'vreme=' in line.lower():
-                    packet_num += 1
-                    time_match = re.search(r'time[=<](\d+\.?\d*)', line.lower())
-                    if time_match:
-                        time_ms = float(time_match.group(1))
-                        times.append(time_ms)
-                        success_count += 1
-                        self.update_signal.emit(line.strip(), True, time_ms)
-                    else:
-                        self.update_signal.emit(line.strip(), True, 0)
-
-                    progress = int((packet_num / self.count) * 100)
-                    self.progress_signal.emit(progress)
-                elif 'reply' in line.lower() or 'javob' in line.lower():
-                    self.update_signal.emit(line.strip(), True, 0)
-                elif 'timeout' in line.lower() or 'unreachable' in line.lower():
-                    packet_num += 1
-                    self.update_signal.emit(line.strip(), False, 0)
-                    progress = int((packet_num / self.count) * 100)
-                    self.progress_signal.emit(progress)
-
-            process.wait()
-
-            # Calculate statistics
-            stats = {
-                'sent': self.count,
-                'received': success_count,
-                'lost': self.count - success_count,
-                'loss_percent': ((self.count - success_count) / self.count * 100) if self.count > 0 else 0,
-                'min': min(times) if times else 0,
-                'max': max(times) if times else 0,
-                'avg': sum(times) / len(times) if times else 0
-            }
-
-            self.finished_signal.emit(stats)
+            # Jarayon ichidagi ICMP: RTT nanosekund aniqlikdagi monoton soatdan
+            result = engines.ping_host(
+                self.host, self.count,
+                interval=self.interval, size=self.size, timeout=self.timeout,
+                on_reply=self.update_signal.emit,
+                on_progress=self.progress_signal.emit,
+                on_stats=self.stats_signal.emit,
+                should_stop=lambda: not self.is_running
+            )
+            self.finished_signal.emit(result['stats'])
 
         except Exception as e:
             self.update_signal.emit(f"Xato: {str(e)}", False, 0)
@@ -95,49 +67,308 @@ class TracerouteThread(QThread):
 
     def run(self):
         try:
-            if platform.system().lower() == 'windows':
-                command = ['tracert', '-d', self.host]
-            else:
-                command = ['traceroute', '-n', self.host]
-
-            process = subprocess.Popen(command, stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE,
-                                       universal_newlines=True)
+            result = engines.traceroute(
+                self.host,
+                on_hop=self.update_signal.emit,
+                should_stop=lambda: not self.is_running
+            )
+            self.finished_signal.emit(len(result['hops']))
 
-            hop_count = 0
-
-            for line in process.stdout:
-                if not self.is_running:
-                    process.terminate()
-                    break
+        except Exception as e:
+            self.update_signal.emit(f"Xato: {str(e)}", 0, '', 0)
+            self.finished_signal.emit(0)
 
-                # Parse hop number
-                hop_match = re.search(r'^\s*(\d+)', line)
-                if hop_match:
-                    hop_count += 1
-                    hop_num = int(hop_match.group(1))
+    def stop(self):
+        self.is_running = False
 
-                    # Parse IP
-                    ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                    ip = ip_match.group(1) if ip_match else 'N/A'
 
-                    # Parse time
-                    time_match = re.search(r'(\d+\.?\d*)\s*ms', line)
-                    time_ms = float(time_match.group(1)) if time_match else 0
+class MtrThread(QThread):
+    round_signal = pyqtSignal(int, list)  # raund, hoplar statistikasi
+    error_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(int)
 
-                    self.update_signal.emit(line.strip(), hop_num, ip, time_ms)
+    def __init__(self, host, interval=1.0):
+        super().__init__()
+        self.host = host
+        self.interval = interval
+        self.is_running = True
 
-            process.wait()
-            self.finished_signal.emit(hop_count)
+    def run(self):
+        try:
+            # To'xtatilguncha: har raundda barcha hoplar parallel tekshiriladi
+            result = engines.mtr(
+                self.host, count=0, interval=self.interval,
+                on_round=self.round_signal.emit,
+                should_stop=lambda: not self.is_running
+            )
+            self.finished_signal.emit(len(result['hops']))
 
         except Exception as e:
-            self.update_signal.emit(f"Xato: {str(e)}", 0, '', 0)
+            self.error_signal.emit(f"Xato: {str(e)}")
             self.finished_signal.emit(0)
 
     def stop(self):
         self.is_running = False
 
 
+class HopTableModel(QAbstractTableModel):
+    """MTR jadvali: har bir hop bitta qator, raundlarda joyida yangilanadi"""
+    HEADERS = ['#', 'Manzil', 'Yo\'qotish', 'Yuborildi', 'Oxirgi', 'O\'rtacha',
+               'Eng yaxshi', 'Eng yomon', 'StDev', 'p95']
+    TIME_KEYS = ['last', 'avg', 'best', 'worst', 'stddev', 'p95']
+
+    def __init__(self):
+        super().__init__()
+        self.hops = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.hops)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        hop = self.hops[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(hop['hop'])
+            if column == 1:
+                return hop['ip'] or '* * *'
+            if column == 2:
+                return f"{hop['loss_percent']:.1f}%"
+            if column == 3:
+                return str(hop['sent'])
+            value = hop[self.TIME_KEYS[column - 4]]
+            return f'{value:.2f}' if value is not None else '-'
+        if role == Qt.TextAlignmentRole and column != 1:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.BackgroundRole and hop['changed']:
+            # Yo'l o'zgargan hop
+            return QColor('#fff3cd')
+        if role == Qt.ForegroundRole and column == 2 and hop['lost']:
+            return QColor('#e74c3c')
+        if role == Qt.ToolTipRole and hop['previous_ip']:
+            return f"Oldingi manzil: {hop['previous_ip']}"
+        return None
+
+    def update_hops(self, hops):
+        """Qatorlar qayta yaratilmaydi: soni o'zgarsa qo'shiladi/olinadi, qolgani dataChanged"""
+        old, new = len(self.hops), len(hops)
+        if new > old:
+            self.beginInsertRows(QModelIndex(), old, new - 1)
+            self.hops = hops
+            self.endInsertRows()
+        elif new < old:
+            self.beginRemoveRows(QModelIndex(), new, old - 1)
+            self.hops = hops
+            self.endRemoveRows()
+        else:
+            self.hops = hops
+        if new:
+            self.dataChanged.emit(self.index(0, 0), self.index(new - 1, len(self.HEADERS) - 1))
+
+    def clear(self):
+        self.beginResetModel()
+        self.hops = []
+        self.endResetModel()
+
+
+class ResultListModel(QAbstractListModel):
+    """Ping/traceroute natijalari ro'yxati.
+
+    Har bir qator - oddiy tuple, vidjet yaratilmaydi; chizish delegatda.
+    Yangi qatorlar FLUSH_INTERVAL_MS da bir marta bitta beginInsertRows
+    bilan qo'shiladi, `max_rows` dan oshganlari boshidan o'chiriladi.
+    """
+
+    def __init__(self, max_rows=RESULT_HISTORY, parent=None):
+        super().__init__(parent)
+        self.max_rows = max_rows
+        self.rows = []
+        self.pending = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.UserRole:
+            return row
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            # Oxirgi maydon - to'liq matn
+            return row[-1]
+        return None
+
+    def append(self, row):
+        self.pending.append(row)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending[-self.max_rows:], []
+        overflow = len(self.rows) + len(batch) - self.max_rows
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            del self.rows[:overflow]
+            self.endRemoveRows()
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+        self.rows.extend(batch)
+        self.endInsertRows()
+
+    def clear(self):
+        self.timer.stop()
+        self.pending = []
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+
+
+class PingResultDelegate(QStyledItemDelegate):
+    """(muvaffaqiyat, vaqt_ms, matn) qatorini chizadi"""
+    HEIGHT = 34
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.time_font = QFont()
+        self.time_font.setPixelSize(14)
+        self.time_font.setBold(True)
+        self.text_font = QFont()
+        self.text_font.setPixelSize(12)
+        self.icon_font = QFont()
+        self.icon_font.setPixelSize(16)
+        self.text_metrics = QFontMetrics(self.text_font)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.HEIGHT)
+
+    def paint(self, painter, option, index):
+        success, time_ms, text = index.data(Qt.UserRole)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor('#1b5e20' if success else '#b71c1c'))
+        painter.drawRoundedRect(rect, 5, 5)
+
+        x = rect.left() + 10
+        if time_ms > 0:
+            painter.setFont(self.time_font)
+            painter.setPen(QColor('#ffeb3b'))
+            painter.drawText(x, rect.top(), 90, rect.height(),
+                             Qt.AlignVCenter | Qt.AlignLeft, f'{time_ms:.3f}ms')
+            x += 90
+        painter.setFont(self.icon_font)
+        painter.setPen(QColor('white'))
+        painter.drawText(x, rect.top(), 26, rect.height(), Qt.AlignCenter,
+                         '✅' if success else '❌')
+        x += 32
+        painter.setFont(self.text_font)
+        width = rect.right() - x - 8
+        painter.drawText(x, rect.top(), width, rect.height(), Qt.AlignVCenter | Qt.AlignLeft,
+                         self.text_metrics.elidedText(text, Qt.ElideRight, width))
+        painter.restore()
+
+
+class TraceHopDelegate(QStyledItemDelegate):
+    """(hop, ip, vaqt_ms, matn) qatorini chizadi"""
+    HEIGHT = 44
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hop_font = QFont()
+        self.hop_font.setPixelSize(18)
+        self.hop_font.setBold(True)
+        self.ip_font = QFont('monospace')
+        self.ip_font.setPixelSize(14)
+        self.time_font = QFont()
+        self.time_font.setPixelSize(14)
+        self.time_font.setBold(True)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.HEIGHT)
+
+    def paint(self, painter, option, index):
+        hop, ip, time_ms, text = index.data(Qt.UserRole)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = option.rect.adjusted(3, 3, -3, -3)
+        gradient = QLinearGradient(rect.topLeft(), rect.topRight())
+        gradient.setColorAt(0, QColor('#2c3e50'))
+        gradient.setColorAt(1, QColor('#3498db'))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(gradient)
+        painter.drawRoundedRect(rect, 8, 8)
+
+        inner = rect.adjusted(12, 0, -12, 0)
+        if not ip:
+            # Xato xabari
+            painter.setFont(self.time_font)
+            painter.setPen(QColor('white'))
+            painter.drawText(inner, Qt.AlignVCenter | Qt.AlignLeft, text)
+            painter.restore()
+            return
+        painter.setFont(self.hop_font)
+        painter.setPen(QColor('#f39c12'))
+        painter.drawText(inner, Qt.AlignVCenter | Qt.AlignLeft, f'#{hop}')
+        painter.setFont(self.ip_font)
+        painter.setPen(QColor('white'))
+        painter.drawText(inner.adjusted(56, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft, ip)
+        painter.setFont(self.time_font)
+        painter.setPen(QColor('#2ecc71'))
+        painter.drawText(inner, Qt.AlignVCenter | Qt.AlignRight,
+                         f'{time_ms:.1f}ms' if time_ms > 0 else '* * *')
+        painter.restore()
+
+
+def make_result_view(model, delegate):
+    """Bir xil balandlikdagi qatorlar: faqat ko'rinadiganlari chiziladi"""
+    view = QListView()
+    view.setModel(model)
+    view.setItemDelegate(delegate)
+    view.setUniformItemSizes(True)
+    view.setSelectionMode(QAbstractItemView.NoSelection)
+    view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+    view.setStyleSheet('QListView { background-color: #1e1e1e; border: none; border-radius: 8px; }')
+
+    # Pastda turgan bo'lsa, yangi qatorlarga ergashadi
+    def follow(*args):
+        bar = view.verticalScrollBar()
+        if bar.value() >= bar.maximum() - 2:
+            QTimer.singleShot(0, view.scrollToBottom)
+    model.rowsInserted.connect(follow)
+    return view
+
+
+def make_history_input(layout):
+    """Natijalar ro'yxatida saqlanadigan qatorlar soni (har bir oyna uchun alohida)"""
+    label = QLabel('🗂️ Tarix (qator):')
+    label.setStyleSheet('font-weight: bold; font-size: 13px;')
+    spin = QSpinBox()
+    spin.setRange(100, 1000000)
+    spin.setSingleStep(1000)
+    spin.setValue(RESULT_HISTORY)
+    layout.addWidget(label, 1)
+    layout.addWidget(spin, 1)
+    return spin
+
+
 class AnimatedCard(QFrame):
     def __init__(self, title, value, color, parent=None):
         super().__init__(parent)
@@ -250,14 +481,14 @@ class NetworkDiagnosticTool(QMainWindow):
             QLineEdit:focus {
                 border: 2px solid #667eea;
             }
-            QSpinBox {
+            QSpinBox, QDoubleSpinBox {
                 padding: 8px;
                 border: 2px solid #e0e0e0;
                 border-radius: 8px;
                 background-color: white;
                 font-size: 14px;
             }
-            QSpinBox:focus {
+            QSpinBox:focus, QDoubleSpinBox:focus {
                 border: 2px solid #667eea;
             }
             QProgressBar {
@@ -287,10 +518,6 @@ class NetworkDiagnosticTool(QMainWindow):
                 left: 15px;
                 padding: 0 5px;
             }
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
         """)
 
         # Central widget
@@ -344,13 +571,44 @@ class NetworkDiagnosticTool(QMainWindow):
         count_label.setStyleSheet('font-weight: bold; font-size: 13px;')
         self.ping_count_input = QSpinBox()
         self.ping_count_input.setMinimum(1)
-        self.ping_count_input.setMaximum(50)
+        self.ping_count_input.setMaximum(1000000)
         self.ping_count_input.setValue(4)
         count_layout.addWidget(count_label, 1)
         count_layout.addWidget(self.ping_count_input, 1)
-        count_layout.addStretch(3)
+
+        interval_label = QLabel('⏱️ Interval (s):')
+        interval_label.setStyleSheet('font-weight: bold; font-size: 13px;')
+        self.ping_interval_input = QDoubleSpinBox()
+        self.ping_interval_input.setDecimals(3)
+        self.ping_interval_input.setRange(0.001, 60)
+        self.ping_interval_input.setSingleStep(0.1)
+        self.ping_interval_input.setValue(1.0)
+        count_layout.addWidget(interval_label, 1)
+        count_layout.addWidget(self.ping_interval_input, 1)
         input_layout.addLayout(count_layout)
 
+        packet_layout = QHBoxLayout()
+        size_label = QLabel('📏 Hajm (bayt):')
+        size_label.setStyleSheet('font-weight: bold; font-size: 13px;')
+        self.ping_size_input = QSpinBox()
+        self.ping_size_input.setRange(0, icmp.MAX_PAYLOAD)
+        self.ping_size_input.setValue(icmp.PAYLOAD_SIZE)
+        packet_layout.addWidget(size_label, 1)
+        packet_layout.addWidget(self.ping_size_input, 1)
+
+        timeout_label = QLabel('⌛ Timeout (s):')
+        timeout_label.setStyleSheet('font-weight: bold; font-size: 13px;')
+        self.ping_timeout_input = QDoubleSpinBox()
+        self.ping_timeout_input.setDecimals(2)
+        self.ping_timeout_input.setRange(0.05, 30)
+        self.ping_timeout_input.setSingleStep(0.5)
+        self.ping_timeout_input.setValue(engines.PING_TIMEOUT)
+        packet_layout.addWidget(timeout_label, 1)
+        packet_layout.addWidget(self.ping_timeout_input, 1)
+
+        self.ping_history_input = make_history_input(packet_layout)
+        input_layout.addLayout(packet_layout)
+
         input_group.setLayout(input_layout)
         layout.addWidget(input_group)
 
@@ -380,19 +638,33 @@ class NetworkDiagnosticTool(QMainWindow):
 
         # Statistics cards
         self.stats_widget = QWidget()
-        stats_layout = QHBoxLayout()
+        stats_layout = QVBoxLayout()
         stats_layout.setSpacing(10)
+        counts_layout = QHBoxLayout()
+        counts_layout.setSpacing(10)
+        times_layout = QHBoxLayout()
+        times_layout.setSpacing(10)
 
         self.card_sent = AnimatedCard('Yuborildi', '0', '#667eea')
         self.card_received = AnimatedCard('Qabul qilindi', '0', '#2ecc71')
         self.card_lost = AnimatedCard('Yo\'qotildi', '0', '#e74c3c')
         self.card_avg = AnimatedCard('O\'rtacha', '0ms', '#f39c12')
-
-        stats_layout.addWidget(self.card_sent)
-        stats_layout.addWidget(self.card_received)
-        stats_layout.addWidget(self.card_lost)
-        stats_layout.addWidget(self.card_avg)
-
+        self.card_jitter = AnimatedCard('Jitter', '0ms', '#9b59b6')
+        self.card_p50 = AnimatedCard('p50', '0ms', '#1abc9c')
+        self.card_p95 = AnimatedCard('p95', '0ms', '#16a085')
+        self.card_p99 = AnimatedCard('p99', '0ms', '#d35400')
+
+        counts_layout.addWidget(self.card_sent)
+        counts_layout.addWidget(self.card_received)
+        counts_layout.addWidget(self.card_lost)
+        counts_layout.addWidget(self.card_avg)
+        times_layout.addWidget(self.card_jitter)
+        times_layout.addWidget(self.card_p50)
+        times_layout.addWidget(self.card_p95)
+        times_layout.addWidget(self.card_p99)
+
+        stats_layout.addLayout(counts_layout)
+        stats_layout.addLayout(times_layout)
         self.stats_widget.setLayout(stats_layout)
         self.stats_widget.setVisible(False)
         layout.addWidget(self.stats_widget)
@@ -401,17 +673,9 @@ class NetworkDiagnosticTool(QMainWindow):
         results_group = QGroupBox('📊 Natijalar')
         results_layout = QVBoxLayout()
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet('QScrollArea { background-color: #1e1e1e; border-radius: 8px; }')
-
-        self.ping_results_widget = QWidget()
-        self.ping_results_layout = QVBoxLayout()
-        self.ping_results_layout.setSpacing(5)
-        self.ping_results_widget.setLayout(self.ping_results_layout)
-
-        scroll.setWidget(self.ping_results_widget)
-        results_layout.addWidget(scroll)
+        self.ping_model = ResultListModel(parent=self)
+        self.ping_list = make_result_view(self.ping_model, PingResultDelegate(self))
+        results_layout.addWidget(self.ping_list)
 
         results_group.setLayout(results_layout)
         layout.addWidget(results_group)
@@ -435,6 +699,18 @@ class NetworkDiagnosticTool(QMainWindow):
         input_layout.addWidget(host_label, 1)
         input_layout.addWidget(self.trace_host_input, 4)
 
+        # Uzluksiz rejim: har bir hop intervalda qayta tekshiriladi (MTR)
+        self.trace_mtr_check = QCheckBox('🔁 Uzluksiz (MTR)')
+        self.trace_interval_input = QDoubleSpinBox()
+        self.trace_interval_input.setDecimals(1)
+        self.trace_interval_input.setRange(0.2, 60)
+        self.trace_interval_input.setSingleStep(0.5)
+        self.trace_interval_input.setValue(1.0)
+        self.trace_interval_input.setSuffix(' s')
+        input_layout.addWidget(self.trace_mtr_check, 1)
+        input_layout.addWidget(self.trace_interval_input, 1)
+        self.trace_history_input = make_history_input(input_layout)
+
         input_group.setLayout(input_layout)
         layout.addWidget(input_group)
 
@@ -475,17 +751,19 @@ class NetworkDiagnosticTool(QMainWindow):
         results_group = QGroupBox('📊 Yo\'nalish')
         results_layout = QVBoxLayout()
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet('QScrollArea { background-color: #1e1e1e; border-radius: 8px; }')
+        self.trace_model = ResultListModel(parent=self)
+        self.trace_list = make_result_view(self.trace_model, TraceHopDelegate(self))
+        results_layout.addWidget(self.trace_list)
 
-        self.trace_results_widget = QWidget()
-        self.trace_results_layout = QVBoxLayout()
-        self.trace_results_layout.setSpacing(5)
-        self.trace_results_widget.setLayout(self.trace_results_layout)
-
-        scroll.setWidget(self.trace_results_widget)
-        results_layout.addWidget(scroll)
+        self.mtr_model = HopTableModel()
+        self.mtr_table = QTableView()
+        self.mtr_table.setModel(self.mtr_model)
+        self.mtr_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.mtr_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.mtr_table.verticalHeader().setVisible(False)
+        self.mtr_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.mtr_table.setVisible(False)
+        results_layout.addWidget(self.mtr_table)
 
         results_group.setLayout(results_layout)
         layout.addWidget(results_group)
@@ -494,67 +772,10 @@ class NetworkDiagnosticTool(QMainWindow):
         return tab
 
     def add_ping_result(self, text, success, time_ms):
-        result_frame = QFrame()
-        result_frame.setStyleSheet(f"""
-            QFrame {{
-                background-color: {'#1b5e20' if success else '#b71c1c'};
-                border-radius: 5px;
-                padding: 8px;
-                margin: 2px;
-            }}
-        """)
-
-        layout = QHBoxLayout()
-
-        icon = QLabel('✅' if success else '❌')
-        icon.setStyleSheet('color: white; font-size: 16px;')
-
-        text_label = QLabel(text[:100])
-        text_label.setStyleSheet('color: white; font-size: 12px;')
-        text_label.setWordWrap(True)
-
-        if time_ms > 0:
-            time_label = QLabel(f'{time_ms:.1f}ms')
-            time_label.setStyleSheet('color: #ffeb3b; font-size: 14px; font-weight: bold;')
-            layout.addWidget(time_label)
-
-        layout.addWidget(icon)
-        layout.addWidget(text_label)
-        layout.addStretch()
-
-        result_frame.setLayout(layout)
-        self.ping_results_layout.addWidget(result_frame)
+        self.ping_model.append((success, time_ms, text))
 
     def add_trace_hop(self, text, hop_num, ip, time_ms):
-        hop_frame = QFrame()
-        hop_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #2c3e50, stop:1 #3498db);
-                border-radius: 8px;
-                padding: 10px;
-                margin: 3px;
-            }
-        """)
-
-        layout = QHBoxLayout()
-
-        hop_label = QLabel(f'#{hop_num}')
-        hop_label.setStyleSheet('color: #f39c12; font-size: 18px; font-weight: bold; min-width: 40px;')
-
-        ip_label = QLabel(ip)
-        ip_label.setStyleSheet('color: white; font-size: 14px; font-family: monospace;')
-
-        time_label = QLabel(f'{time_ms:.1f}ms' if time_ms > 0 else '* * *')
-        time_label.setStyleSheet('color: #2ecc71; font-size: 14px; font-weight: bold;')
-
-        layout.addWidget(hop_label)
-        layout.addWidget(ip_label)
-        layout.addStretch()
-        layout.addWidget(time_label)
-
-        hop_frame.setLayout(layout)
-        self.trace_results_layout.addWidget(hop_frame)
+        self.trace_model.append((hop_num, ip, time_ms, text))
 
     def start_ping(self):
         host = self.ping_host_input.text().strip()
@@ -563,6 +784,7 @@ class NetworkDiagnosticTool(QMainWindow):
             return
 
         self.clear_ping()
+        self.ping_model.max_rows = self.ping_history_input.value()
         count = self.ping_count_input.value()
 
         self.ping_start_btn.setEnabled(False)
@@ -571,9 +793,13 @@ class NetworkDiagnosticTool(QMainWindow):
         self.ping_progress.setValue(0)
         self.stats_widget.setVisible(True)
 
-        self.thread = PingThread(host, count)
+        self.thread = PingThread(host, count,
+                                 interval=self.ping_interval_input.value(),
+                                 size=self.ping_size_input.value(),
+                                 timeout=self.ping_timeout_input.value())
         self.thread.update_signal.connect(self.add_ping_result)
         self.thread.progress_signal.connect(self.ping_progress.setValue)
+        self.thread.stats_signal.connect(self.update_stats)
         self.thread.finished_signal.connect(self.ping_finished)
         self.thread.start()
 
@@ -584,45 +810,72 @@ class NetworkDiagnosticTool(QMainWindow):
             return
 
         self.clear_trace()
+        self.trace_model.max_rows = self.trace_history_input.value()
 
         self.trace_start_btn.setEnabled(False)
         self.trace_stop_btn.setEnabled(True)
         self.trace_hop_label.setVisible(True)
         self.trace_hop_label.setText('Hops: 0')
 
+        mtr_mode = self.trace_mtr_check.isChecked()
+        self.trace_list.setVisible(not mtr_mode)
+        self.mtr_table.setVisible(mtr_mode)
+        if mtr_mode:
+            self.thread = MtrThread(host, self.trace_interval_input.value())
+            self.thread.round_signal.connect(self.update_mtr)
+            self.thread.error_signal.connect(self.mtr_error)
+            self.thread.finished_signal.connect(self.trace_finished)
+            self.thread.start()
+            return
+
         self.thread = TracerouteThread(host)
         self.thread.update_signal.connect(self.add_trace_hop)
         self.thread.finished_signal.connect(self.trace_finished)
         self.thread.start()
 
+    def update_stats(self, stats):
+        self.card_sent.update_value(str(stats['sent']))
+        self.card_received.update_value(str(stats['received']))
+        self.card_lost.update_value(f"{stats['lost']} ({stats['loss_percent']:.1f}%)")
+        self.card_avg.update_value(f"{stats['avg']:.3f}ms")
+        self.card_jitter.update_value(f"{stats['jitter']:.3f}ms")
+        self.card_p50.update_value(f"{stats['p50']:.3f}ms")
+        self.card_p95.update_value(f"{stats['p95']:.3f}ms")
+        self.card_p99.update_value(f"{stats['p99']:.3f}ms")
+
     def ping_finished(self, stats):
         if stats:
-            self.card_sent.update_value(str(stats['sent']))
-            self.card_received.update_value(str(stats['received']))
-            self.card_lost.update_value(f"{stats['lost']} ({stats['loss_percent']:.1f}%)")
-            self.card_avg.update_value(f"{stats['avg']:.1f}ms")
+            self.update_stats(stats)
 
         self.ping_start_btn.setEnabled(True)
         self.ping_stop_btn.setEnabled(False)
         self.ping_progress.setVisible(False)
 
+    def update_mtr(self, round_no, hops):
+        self.mtr_model.update_hops(hops)
+        changed = sum(1 for hop in hops if hop['changed'])
+        text = f'Raund: {round_no}   Hops: {len(hops)}'
+        if changed:
+            text += f'   ⚠️ Yo\'l o\'zgardi: {changed} hop'
+        self.trace_hop_label.setText(text)
+
+    def mtr_error(self, text):
+        self.trace_list.setVisible(True)
+        self.mtr_table.setVisible(False)
+        self.add_trace_hop(text, 0, '', 0)
+
     def trace_finished(self, hop_count):
         self.trace_hop_label.setText(f'Umumiy Hops: {hop_count}')
         self.trace_start_btn.setEnabled(True)
         self.trace_stop_btn.setEnabled(False)
 
     def clear_ping(self):
-        while self.ping_results_layout.count():
-            child = self.ping_results_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.ping_model.clear()
         self.stats_widget.setVisible(False)
 
     def clear_trace(self):
-        while self.trace_results_layout.count():
-            child = self.trace_results_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.trace_model.clear()
+        self.mtr_model.clear()
         self.trace_hop_label.setVisible(False)
 
     def stop_thread(self):
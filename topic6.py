@@ -1,11 +1,11 @@
 import sys
-import subprocess
-import platform
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
                              QTextEdit, QProgressBar)
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 
+import engines
+
 class PingMonitorThread(QThread):
     update_signal = pyqtSignal(str, bool)
     progress_signal = pyqtSignal(int)
@@ -18,22 +18,12 @@ class PingMonitorThread(QThread):
         self.is_running = True
 
     def run(self):
-        param = "-n" if platform.system().lower() == "windows" else "-c"
-        for i in range(1, self.count + 1):
-            if not self.is_running:
-                break
-            command = ["ping", param, "1", self.host]
-            process = subprocess.Popen(command, stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE, universal_newlines=True)
-            success = False
-            for line in process.stdout:
-                line = line.strip()
-                if "time=" in line.lower() or "reply" in line.lower():
-                    success = True
-            self.update_signal.emit(f"{self.host} - {'Online' if success else 'Offline'}", success)
-            progress = int((i / self.count) * 100)
-            self.progress_signal.emit(progress)
-            self.msleep(1000)  # 1 soniya kutish
+        engines.monitor_host(
+            self.host, self.count, interval=1.0,  # 1 soniya kutish
+            on_result=self.update_signal.emit,
+            on_progress=self.progress_signal.emit,
+            should_stop=lambda: not self.is_running
+        )
         self.finished_signal.emit()
 
     def stop(self):
@@ -0,0 +1,231 @@
+"""Jarayon ichidagi parallel traceroute (UDP + IP_TTL + IP_RECVERR, Linux).
+
+`traceroute -n` hoplarni birma-bir kutadi. Bu yerda har bir TTL uchun
+alohida UDP soket ochiladi va barcha probe'lar bir vaqtda yuboriladi;
+yo'ldagi routerlarning ICMP xatolari (time exceeded / port unreachable)
+soketning xatolar navbatidan (MSG_ERRQUEUE) o'qiladi, shuning uchun raw
+soket va root huquqi kerak emas. Javob qaysi probe'ga tegishliligi
+soket (TTL) va maqsad porti bo'yicha aniqlanadi.
+
+Butun yo'l taxminan bitta RTT (+ javob bermagan hoplar uchun timeout)
+ichida aniqlanadi. `HopStats` - MTR rejimida har bir hop bo'yicha
+raundlar statistikasi.
+"""
+import errno
+import select
+import socket
+import struct
+import sys
+import time
+
+import rttstats
+
+# Linux'da IP_RECVERR = 11 (Python'ning eski versiyalarida konstanta yo'q)
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+
+ICMP_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+
+MAX_HOPS = 30
+# Yo'l o'zgargan hop shuncha raund davomida belgilangan bo'ladi
+CHANGE_ROUNDS = 5
+# Klassik traceroute portlari; har bir probe keyingi portga yuboriladi
+BASE_PORT = 33434
+PORT_RANGE = 1024
+
+_EXTENDED_ERR = struct.Struct("=IBBBBII")  # struct sock_extended_err
+
+
+def available():
+    return sys.platform.startswith("linux")
+
+
+def parse_error(ancdata):
+    """MSG_ERRQUEUE xabaridan (icmp_type, icmp_code, javob bergan ip) yoki None"""
+    for level, kind, data in ancdata:
+        if level != socket.SOL_IP or kind != IP_RECVERR or len(data) < _EXTENDED_ERR.size:
+            continue
+        _, origin, icmp_type, icmp_code, _, _, _ = _EXTENDED_ERR.unpack_from(data)
+        if origin != SO_EE_ORIGIN_ICMP:
+            return None
+        # Ortidan sockaddr_in: javob bergan router manzili (SO_EE_OFFENDER)
+        offender = data[_EXTENDED_ERR.size:]
+        if len(offender) < 8:
+            return None
+        return icmp_type, icmp_code, socket.inet_ntoa(offender[4:8])
+    return None
+
+
+def _ignore(*_):
+    pass
+
+
+class UdpTracer:
+    """Bitta maqsadgacha bo'lgan yo'lni raundlar bilan tekshiradi.
+
+    Har bir `round()` da 1..`last_hop` TTL'lar uchun bittadan probe
+    yuboriladi. Maqsad javob bergan eng kichik TTL `dest_hop` da
+    saqlanadi va keyingi raundlar shu hopgacha cheklanadi.
+    """
+
+    def __init__(self, dest, max_hops=MAX_HOPS, timeout=1.0, port=BASE_PORT):
+        if not available():
+            raise OSError(errno.ENOTSUP, "IP_RECVERR faqat Linux'da mavjud")
+        self.dest = socket.gethostbyname(dest)
+        self.max_hops = max_hops
+        self.timeout_ns = int(timeout * 1e9)
+        self.port = port
+        self.seq = 0
+        self.dest_hop = None
+        self.socks = {}  # ttl -> soket
+        self.ttl_of = {}  # fileno -> ttl
+
+    @property
+    def last_hop(self):
+        return self.dest_hop or self.max_hops
+
+    def _socket(self, ttl):
+        sock = self.socks.get(ttl)
+        if sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            sock.setsockopt(socket.SOL_IP, socket.IP_TTL, ttl)
+            sock.setsockopt(socket.SOL_IP, IP_RECVERR, 1)
+            self.socks[ttl] = sock
+            self.ttl_of[sock.fileno()] = ttl
+        return sock
+
+    def close(self):
+        for sock in self.socks.values():
+            sock.close()
+        self.socks = {}
+        self.ttl_of = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_port(self):
+        self.seq += 1
+        return self.port + self.seq % PORT_RANGE
+
+    def round(self, on_reply=None, should_stop=None):
+        """Bitta raund: [(ttl, ip yoki None, rtt_ms yoki None), ...] TTL tartibida.
+
+        `on_reply(ttl, ip, rtt_ms)` javoblar kelish tartibida chaqiriladi.
+        """
+        pending = {}  # (ttl, port) -> yuborilgan vaqt (ns)
+        results = {}
+        poller = select.poll()
+        # Oldingi raund timeout'idan keyin kelgan javoblar navbatda qolgan
+        # bo'lishi mumkin; ular sk_err'ni o'rnatadi va sendto xato beradi
+        for ttl, sock in self.socks.items():
+            self._drain(sock, ttl, _ignore)
+        for ttl in range(1, self.last_hop + 1):
+            sock = self._socket(ttl)
+            port = self._next_port()
+            sent = self._send(sock, port)
+            if sent is None:
+                # Yo'nalish yo'q va h.k. - probe yo'qolgan
+                results[ttl] = (None, None)
+                continue
+            pending[(ttl, port)] = sent
+            poller.register(sock, select.POLLIN | select.POLLERR)
+
+        def answer(ttl, port, ip, reached):
+            sent = pending.pop((ttl, port), None)
+            if sent is None or ttl > self.last_hop:
+                return
+            rtt_ms = (time.monotonic_ns() - sent) / 1e6
+            results[ttl] = (ip, rtt_ms)
+            if reached and (self.dest_hop is None or ttl < self.dest_hop):
+                self.dest_hop = ttl
+            if on_reply:
+                on_reply(ttl, ip, rtt_ms)
+
+        started = time.monotonic_ns()
+        while any(ttl <= self.last_hop for ttl, _ in pending):
+            if should_stop is not None and should_stop():
+                break
+            left = started + self.timeout_ns - time.monotonic_ns()
+            if left <= 0:
+                break
+            for fd, _ in poller.poll(min(left / 1e6, 50)):
+                ttl = self.ttl_of[fd]
+                self._drain(self.socks[ttl], ttl, answer)
+
+        return [(ttl,) + results.get(ttl, (None, None)) for ttl in range(1, self.last_hop + 1)]
+
+    def _send(self, sock, port):
+        """Probe yuboradi; yuborilgan vaqt (ns) yoki haqiqiy xato bo'lsa None"""
+        for _ in range(2):
+            sent = time.monotonic_ns()
+            try:
+                sock.sendto(b"\0" * 32, (self.dest, port))
+                return sent
+            except (BlockingIOError, InterruptedError):
+                return None
+            except OSError:
+                # Drenajdan keyin kelgan eski xato - navbatni bo'shatib qayta urinamiz
+                self._drain(sock, self.ttl_of[sock.fileno()], _ignore)
+        return None
+
+    def _drain(self, sock, ttl, answer):
+        while True:
+            try:
+                _, ancdata, _, addr = sock.recvmsg(512, 512, MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            parsed = parse_error(ancdata)
+            if parsed is None:
+                continue
+            icmp_type, _, ip = parsed
+            # Manzilga yetdi (port unreachable) yoki yo'l yopiq (boshqa unreachable)
+            answer(ttl, addr[1], ip, icmp_type == ICMP_UNREACHABLE)
+        while True:
+            # Maqsaddagi UDP xizmat javob qaytargan bo'lsa ham manzilga yetilgan
+            try:
+                _, addr = sock.recvfrom(512)
+            except (BlockingIOError, InterruptedError, ConnectionError):
+                return
+            except OSError:
+                return
+            if addr[0] == self.dest:
+                answer(ttl, addr[1], addr[0], True)
+
+
+class HopStats:
+    """Bitta hop: javob bergan manzil, RTT statistikasi va yo'l o'zgarishlari"""
+
+    def __init__(self, hop):
+        self.hop = hop
+        self.ip = None
+        self.previous_ip = None
+        self.changed_round = None
+        self.stats = rttstats.RttStats()
+
+    def add(self, ip, rtt_ms, round_no):
+        if ip is not None:
+            if self.ip is not None and ip != self.ip:
+                self.previous_ip = self.ip
+                self.changed_round = round_no
+            self.ip = ip
+        self.stats.add(rtt_ms)
+
+    def snapshot(self, round_no):
+        changed = self.changed_round is not None and \
+            round_no - self.changed_round < CHANGE_ROUNDS
+        return {"hop": self.hop, "ip": self.ip, "previous_ip": self.previous_ip,
+                "changed": changed, **self.stats.snapshot()}
+
+
+def trace(dest, max_hops=MAX_HOPS, timeout=1.0, on_reply=None, should_stop=None):
+    """Bitta raundli traceroute: [(ttl, ip, rtt_ms), ...], manzilgacha"""
+    with UdpTracer(dest, max_hops, timeout) as tracer:
+        return tracer.round(on_reply, should_stop)
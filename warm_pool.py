@@ -0,0 +1,362 @@
+"""Oldindan isitilgan Python jarayonlari hovuzi (forkserver uslubida).
+
+Har bir ishchi (zygote) og'ir modullarni (PyQt5, requests, ...) bir marta
+import qiladi va keyin har bir ishga tushirish uchun fork qiladi. Bola
+jarayonning stdout/stderr'i ota jarayonga SCM_RIGHTS orqali berilgan
+pipe'ga ulanadi, shuning uchun natijani odatdagi Popen kabi o'qish mumkin.
+
+Sozlamalar (muhit o'zgaruvchilari):
+    WARM_POOL_SIZE      - ishchilar soni (0 - hovuz o'chirilgan)
+    WARM_POOL_MAX_RUNS  - ishchi shuncha fork'dan keyin almashtiriladi
+    WARM_POOL_PRELOAD   - oldindan import qilinadigan modullar (vergul bilan)
+"""
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import threading
+
+POOL_SIZE = int(os.environ.get("WARM_POOL_SIZE", 2))
+MAX_RUNS = int(os.environ.get("WARM_POOL_MAX_RUNS", 50))
+PRELOAD = os.environ.get(
+    "WARM_POOL_PRELOAD",
+    "PyQt5.QtWidgets,PyQt5.QtCore,PyQt5.QtGui,requests,"
+    "subprocess,platform,ipaddress,socket,http.client,json,re"
+).split(",")
+
+# Ishchidan javob kutish vaqti (soniya)
+REPLY_TIMEOUT = 10
+
+
+def supported():
+    return hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+def apply_rlimits(limits):
+    """Bola jarayonga CPU vaqti va xotira chegaralarini qo'yadi.
+
+    Linux RLIMIT_RSS'ni hisobga olmaydi, shuning uchun xotira RLIMIT_AS
+    (virtual manzil maydoni) orqali cheklanadi.
+    """
+    import resource
+    cpu = limits.get("cpu")
+    if cpu:
+        # Yumshoq chegarada SIGXCPU, qattiq chegarada SIGKILL
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))
+    memory = limits.get("memory")
+    if memory:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+
+# ===================== ISHCHI (ZYGOTE) QISMI =====================
+def _run_child(request, out_fd):
+    """Fork qilingan bolada mavzu faylini __main__ sifatida bajaradi"""
+    import runpy
+    import traceback
+
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_fd, 1)
+    os.dup2(out_fd, 2)
+    os.close(devnull)
+    os.close(out_fd)
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+
+    code = 0
+    try:
+        apply_rlimits(request.get("limits", {}))
+        os.chdir(request["cwd"])
+        os.environ.update(request.get("env", {}))
+        path = request["file"]
+        sys.argv = [path]
+        sys.path[0] = os.path.dirname(os.path.abspath(path))
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _worker_main(fd, max_runs):
+    for name in PRELOAD:
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            __import__(name)
+        except Exception:
+            pass
+
+    sock = socket.socket(fileno=fd)
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda *args: None)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
+    sel.register(wake_r, selectors.EVENT_READ)
+
+    runs = 0
+    children = set()
+    parent_open = True
+
+    def send(msg):
+        try:
+            sock.send(json.dumps(msg).encode())
+        except OSError:
+            pass
+
+    send({"ready": True})
+
+    while parent_open or children:
+        for key, _ in sel.select(timeout=1.0):
+            if key.fileobj is sock:
+                try:
+                    data, fds, _, _ = socket.recv_fds(sock, 65536, 1)
+                except OSError:
+                    data, fds = b"", []
+                if not data:
+                    parent_open = False
+                    sel.unregister(sock)
+                    continue
+                request = json.loads(data)
+                pid = os.fork()
+                if pid == 0:
+                    sel.close()
+                    sock.close()
+                    os.close(wake_r)
+                    os.close(wake_w)
+                    _run_child(request, fds[0])
+                os.close(fds[0])
+                children.add(pid)
+                runs += 1
+                send({"id": request["id"], "pid": pid})
+                if runs >= max_runs:
+                    send({"retire": True})
+            else:
+                try:
+                    while os.read(wake_r, 512):
+                        pass
+                except BlockingIOError:
+                    pass
+
+        # Tugagan bolalarni yig'ish
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                children.clear()
+                break
+            if pid == 0:
+                break
+            children.discard(pid)
+            send({"pid": pid, "code": os.waitstatus_to_exitcode(status)})
+
+
+# ===================== OTA JARAYON QISMI =====================
+class WarmProcess:
+    """Fork qilingan bola uchun subprocess.Popen'ga o'xshash obyekt"""
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.pid = None
+        self.returncode = None
+        self._started = threading.Event()
+        self._done = threading.Event()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired("warm-pool", timeout)
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.returncode is None and self.pid:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def _finish(self, code):
+        self.returncode = code
+        self._done.set()
+
+
+class _Worker:
+    def __init__(self, max_runs, on_retire=None):
+        parent_sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.sock = parent_sock
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             str(child_sock.fileno()), str(max_runs)],
+            pass_fds=(child_sock.fileno(),),
+            stdin=subprocess.DEVNULL,
+        )
+        child_sock.close()
+        self.lock = threading.Lock()
+        self.pending = {}   # so'rov id -> WarmProcess (pid kutilmoqda)
+        self.procs = {}     # pid -> WarmProcess
+        self.seq = 0
+        self.retired = False
+        self.alive = True
+        self.ready = threading.Event()
+        self.on_retire = on_retire
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def spawn(self, file_path, env=None, limits=None):
+        read_fd, write_fd = os.pipe()
+        proc = WarmProcess(open(read_fd, "rb"))
+        request = {"file": file_path, "cwd": os.getcwd(), "env": env or {},
+                   "limits": limits or {}}
+        try:
+            with self.lock:
+                self.seq += 1
+                request["id"] = self.seq
+                self.pending[self.seq] = proc
+                socket.send_fds(self.sock, [json.dumps(request).encode()], [write_fd])
+        except OSError:
+            proc.stdout.close()
+            raise
+        finally:
+            os.close(write_fd)
+
+        if not proc._started.wait(REPLY_TIMEOUT):
+            proc.stdout.close()
+            raise RuntimeError("Warm pool ishchisi javob bermadi")
+        return proc
+
+    def _read_loop(self):
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            msg = json.loads(data)
+            if msg.get("retire") and self.on_retire:
+                self.on_retire(self)
+            with self.lock:
+                if msg.get("ready"):
+                    self.ready.set()
+                elif msg.get("retire"):
+                    self.retired = True
+                elif "id" in msg:
+                    proc = self.pending.pop(msg["id"])
+                    proc.pid = msg["pid"]
+                    self.procs[proc.pid] = proc
+                    proc._started.set()
+                elif "pid" in msg:
+                    proc = self.procs.pop(msg["pid"], None)
+                    if proc:
+                        proc._finish(msg["code"])
+                if self.retired and not self.procs and not self.pending:
+                    self.close()
+
+        # Ishchi yopildi: javobsiz qolgan jarayonlar holati noma'lum
+        with self.lock:
+            self.alive = False
+            for proc in list(self.pending.values()) + list(self.procs.values()):
+                proc._finish(-1)
+            self.pending.clear()
+            self.procs.clear()
+        self.ready.set()
+        self.sock.close()
+        self.process.wait()
+
+    def usable(self):
+        return self.alive and not self.retired
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+class WarmPool:
+    def __init__(self, size=POOL_SIZE, max_runs=MAX_RUNS):
+        self.size = size
+        self.max_runs = max_runs
+        self.lock = threading.Lock()
+        self.workers = [self._new_worker() for _ in range(size)]
+        self.next = 0
+
+    def _new_worker(self):
+        return _Worker(self.max_runs, on_retire=self._replace)
+
+    def _replace(self, worker):
+        """Ishchi almashtirilishini bildirganda o'rniga yangisini oldindan isitadi"""
+        with self.lock:
+            if worker in self.workers:
+                self.workers[self.workers.index(worker)] = self._new_worker()
+
+    def _pick(self):
+        # Ishdan chiqqan ishchilar o'rniga yangisi isitila boshlaydi, so'rov
+        # esa tayyor ishchilardan biriga navbat bilan beriladi
+        with self.lock:
+            self.workers = [w if w.usable() else self._new_worker() for w in self.workers]
+            ready = [w for w in self.workers if w.ready.is_set()] or self.workers
+            worker = ready[self.next % len(ready)]
+            self.next += 1
+        worker.ready.wait(REPLY_TIMEOUT)
+        return worker
+
+    def spawn(self, file_path, env=None, limits=None):
+        """Mavzu faylini isitilgan ishchidan fork qilib ishga tushiradi"""
+        return self._pick().spawn(file_path, env, limits)
+
+    def close(self):
+        with self.lock:
+            for worker in self.workers:
+                worker.close()
+            self.workers = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Umumiy hovuzni qaytaradi (o'chirilgan bo'lsa None)"""
+    global _pool
+    if POOL_SIZE <= 0 or not supported():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmPool()
+        return _pool
+
+
+if __name__ == "__main__" and len(sys.argv) == 4 and sys.argv[1] == "--worker":
+    _worker_main(int(sys.argv[2]), int(sys.argv[3]))